@@ -1,6 +1,7 @@
 import os
 from dotenv import load_dotenv
-from supabase import create_client
+import httpx
+from supabase import create_client, ClientOptions
 from google.cloud import documentai_v1 as documentai
 import googlemaps
 
@@ -12,8 +13,23 @@ SUPABASE_KEY = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
 if not SUPABASE_URL or not SUPABASE_KEY:
     raise ValueError("Missing required Supabase environment variables")
 
+# supabase_client is a process-wide singleton. Its PostgREST and storage sub-clients are built once on it
+# and each keeps its own pooled keep-alive HTTP/2 httpx session (HTTP/2 needs the h2 package).
+# They must not share one httpx client: postgrest and storage3 each set base_url on the client they are given.
+#
+# Separate long-lived HTTP/2 pool for the worker's streamed storage downloads (download_from_supabase).
+http_client = httpx.Client(
+    http2=True,
+    timeout=30.0,
+    limits=httpx.Limits(max_keepalive_connections=64, max_connections=64, keepalive_expiry=300),
+)
+
 try:
-    supabase_client = create_client(SUPABASE_URL, SUPABASE_KEY)
+    supabase_client = create_client(
+        SUPABASE_URL,
+        SUPABASE_KEY,
+        options=ClientOptions(postgrest_client_timeout=30),
+    )
     supabase_auth = create_client(SUPABASE_URL, SUPABASE_KEY)
 except Exception as e:
     raise
@@ -10,4 +10,25 @@ def update_processing_job(supabase_client, job_id, update_data):
     response = supabase_client.table("processing_jobs").update(update_data).eq("id", job_id).execute()
     if hasattr(response, 'error') and response.error:
         raise HTTPException(status_code=500, detail=f"Supabase error: {response.error}")
-    return response 
\ No newline at end of file
+    return response 
+
+def claim_next_processing_job(supabase_client, worker_id):
+    """
+    Atomically move the oldest queued job to processing and return it (None if the queue is empty).
+    The row also carries the school's docai_processor_id, card_fields and majors.
+    """
+    response = supabase_client.rpc("claim_next_job", {"p_worker_id": worker_id}).execute()
+    if hasattr(response, 'error') and response.error:
+        raise HTTPException(status_code=500, detail=f"Supabase error: {response.error}")
+    return response.data[0] if response.data else None
+
+
+def try_claim_processing_job(supabase_client, job_id, worker_id):
+    """
+    Move a specific job from queued to processing and return it, or None if it was not queued
+    (already claimed by another worker, finished, or missing).
+    """
+    response = supabase_client.rpc("try_claim_job", {"p_job_id": job_id, "p_worker_id": worker_id}).execute()
+    if hasattr(response, 'error') and response.error:
+        raise HTTPException(status_code=500, detail=f"Supabase error: {response.error}")
+    return response.data[0] if response.data else None
\ No newline at end of file
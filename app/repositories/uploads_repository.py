@@ -54,6 +54,7 @@ def update_job_status_with_review(
 ):
     """
     Update job status and create/update reviewed data in a transaction
+    (via the finalize_job RPC)
     """
     print(f"[DATABASE DEBUG] === UPDATE JOB STATUS WITH REVIEW ===")
     print(f"[DATABASE DEBUG] Job ID: {job_id}")
@@ -64,10 +65,8 @@ def update_job_status_with_review(
     print(f"[DATABASE DEBUG] 🔍 JSON VALIDATION - CRITICAL FIELDS:")
     
     try:
-        # Serialize and deserialize to check for JSON corruption
-        import json
-        serialized = json.dumps(review_data)
-        deserialized = json.loads(serialized)
+        # Only the critical fields are serialized here; the full payload is serialized once, by the RPC call
+        import orjson
         
         # Check for critical fields in the JSON
         fields_data = review_data.get('fields', {})
@@ -77,7 +76,7 @@ def update_job_status_with_review(
                 print(f"[DATABASE DEBUG]   - {field_name}: value='{field_data.get('value')}', type={type(field_data.get('value'))}")
                 
                 # Check for JSON corruption indicators
-                field_str = json.dumps(field_data)
+                field_str = orjson.dumps(field_data, default=str).decode()
                 if '{{' in field_str or '}}' in field_str:
                     print(f"[DATABASE DEBUG] 🚨 JSON CORRUPTION DETECTED in {field_name}: {field_str[:200]}...")
                 if field_str.count('{') != field_str.count('}'):
@@ -85,7 +84,7 @@ def update_job_status_with_review(
             else:
                 print(f"[DATABASE DEBUG]   - {field_name}: FIELD_NOT_FOUND")
                 
-        print(f"[DATABASE DEBUG] JSON validation passed - serialized length: {len(serialized)}")
+        print(f"[DATABASE DEBUG] JSON validation passed - {len(review_data.get('fields') or {})} fields")
         
     except Exception as e:
         print(f"[DATABASE DEBUG] 🚨 JSON VALIDATION FAILED: {str(e)}")
@@ -93,21 +92,23 @@ def update_job_status_with_review(
         print(f"[DATABASE DEBUG] Raw review_data type: {type(review_data)}")
         print(f"[DATABASE DEBUG] Raw fields keys: {list(review_data.get('fields', {}).keys()) if isinstance(review_data.get('fields'), dict) else 'NOT_DICT'}")
     
-    # Update job status first
-    job_response = supabase_client.table("processing_jobs").update({
-        "status": status,
-        "updated_at": datetime.now(timezone.utc).isoformat()
-    }).eq("id", job_id).execute()
+    # Upsert review data and update job status in one round trip (single transaction)
+    print(f"[DATABASE DEBUG] About to finalize job and upsert reviewed_data...")
+    response = supabase_client.rpc("finalize_job", {
+        "p_job_id": job_id,
+        "p_status": status,
+        "p_reviewed": review_data
+    }).execute()
     
-    # Then upsert review data 
-    print(f"[DATABASE DEBUG] About to upsert reviewed_data...")
-    review_response = supabase_client.table("reviewed_data").upsert(review_data, on_conflict="document_id").execute()
+    # finalize_job returns the job's new status; anything else means the job was not finalized
+    if response.data != status:
+        raise HTTPException(
+            status_code=500,
+            detail=f"finalize_job did not set job {job_id} to '{status}' (got {response.data!r})"
+        )
     
     print(f"[DATABASE DEBUG] Database operations completed successfully")
-    return {
-        "job": job_response,
-        "review": review_response
-    }
+    return response
 
 @safe_db_operation("Update processing job")
 def update_processing_job_db(supabase_client, job_id: str, updates: Dict[str, Any]):
@@ -1,16 +1,21 @@
 import json
+import re
 from datetime import datetime, timezone
 from typing import Dict, Any, Optional
 from app.services.document_service import validate_address_with_google, validate_zip_code
 from app.core.clients import gmaps_client
 from app.utils.retry_utils import log_debug
 
-def validate_and_enhance_address(fields: Dict[str, Any]) -> Dict[str, Any]:
+# Street number at the start of an address: digits, possibly followed by a letter like 123A
+_STREET_NUMBER = re.compile(r'\s*\d+[A-Za-z]?\s+')
+
+def validate_and_enhance_address(fields: Dict[str, Any], zip_validations: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
     """
     Post-processing address validation that enhances but never overwrites good data
     
     Args:
         fields: Field data after Gemini processing
+        zip_validations: Optional zip code -> validate_zip_code result already looked up by the caller
         
     Returns:
         Enhanced field data with validated address components
@@ -65,7 +70,10 @@ def validate_and_enhance_address(fields: Dict[str, Any]) -> Dict[str, Any]:
     if zip_code:
         try:
             # First try zip code validation to get city and state
-            zip_validation = validate_zip_code(zip_code)
+            if zip_validations is not None and zip_code in zip_validations:
+                zip_validation = zip_validations[zip_code]
+            else:
+                zip_validation = validate_zip_code(zip_code)
             if zip_validation:
                 # Enhance city if missing or low confidence
                 if 'city' in zip_validation and _should_enhance_field(fields.get('city', {}), zip_validation['city']):
@@ -282,13 +290,7 @@ def _check_for_invalid_addresses(fields: Dict[str, Any]) -> None:
             return
     
     # Check for incomplete addresses missing street numbers
-    import re
-    
-    # Look for street number at the beginning of the address
-    # Street number patterns: digits (possibly followed by letter like 123A)
-    street_number_pattern = r'^\s*\d+[A-Za-z]?\s+'
-    
-    if not re.match(street_number_pattern, address_value):
+    if not _STREET_NUMBER.match(address_value):
         # No street number found - this is likely an incomplete address
         address_field['requires_human_review'] = True
         address_field['review_notes'] = f"Address appears incomplete - missing street number: '{address_value}'"
@@ -1,26 +1,58 @@
+import io
 import os
 import json
+import threading
 from datetime import datetime, timezone
-from typing import Dict, Any, Tuple
+from typing import Dict, Any, Optional, Tuple
 from google.cloud import documentai_v1 as documentai
 from PIL import Image
 from app.config import PROJECT_ID, DOCAI_LOCATION, TRIMMED_FOLDER
-from app.utils.retry_utils import retry_with_exponential_backoff, log_debug
+from app.utils.retry_utils import retry_with_exponential_backoff, log_debug, DEBUG_PAYLOADS
+from app.utils.image_processing import apply_exif_orientation
 
-def process_image_with_docai(image_path: str, processor_id: str) -> Tuple[Dict[str, Any], str]:
+MIME_TYPES = {
+    '.pdf': 'application/pdf',
+    '.png': 'image/png',
+    '.jpg': 'image/jpeg',
+    '.jpeg': 'image/jpeg',
+    '.tiff': 'image/tiff',
+    '.tif': 'image/tiff',
+    '.gif': 'image/gif',
+    '.bmp': 'image/bmp'
+}
+
+_docai_client = None
+_docai_client_lock = threading.Lock()
+
+def get_docai_client() -> documentai.DocumentProcessorServiceClient:
+    """
+    Return the process-wide DocAI client, creating it on first use.
+    The gRPC channel (and its TLS session) is reused by every job instead of being rebuilt per image.
+    Pinned to the processors' regional endpoint rather than the global one.
+    """
+    global _docai_client
+    if _docai_client is None:
+        with _docai_client_lock:
+            if _docai_client is None:
+                _docai_client = documentai.DocumentProcessorServiceClient(
+                    client_options={"api_endpoint": f"{DOCAI_LOCATION}-documentai.googleapis.com"}
+                )
+    return _docai_client
+
+def process_image_with_docai(image_path: str, processor_id: str) -> Tuple[Dict[str, Any], str, Optional[bytes]]:
     """
     Single, reliable DocAI processing function that:
     1. Calls DocAI API
     2. Extracts entities with confidence scores and bounding boxes
-    3. Crops image based on detected entities
-    4. Returns standardized field format and cropped image path
+    3. Crops image based on detected entities (Gemini crop and trimmed review image in one pass)
+    4. Returns standardized field format, cropped image path and trimmed JPEG bytes
     
     Args:
         image_path: Path to the input image
         processor_id: DocAI processor ID to use
         
     Returns:
-        Tuple of (field_data_dict, cropped_image_path)
+        Tuple of (field_data_dict, cropped_image_path, trimmed_jpeg_bytes or None if trimming failed)
     """
     try:
         # Log image details
@@ -28,8 +60,7 @@ def process_image_with_docai(image_path: str, processor_id: str) -> Tuple[Dict[s
         log_debug(f"Image exists: {os.path.exists(image_path)}", service="docai")
         log_debug(f"Image size: {os.path.getsize(image_path)} bytes", service="docai")
         
-        # Initialize DocAI client
-        client = documentai.DocumentProcessorServiceClient()
+        client = get_docai_client()
         name = f"projects/{PROJECT_ID}/locations/{DOCAI_LOCATION}/processors/{processor_id}"
         
         log_debug(f"Using DocAI processor: {name}", service="docai")
@@ -41,16 +72,7 @@ def process_image_with_docai(image_path: str, processor_id: str) -> Tuple[Dict[s
         
         # Determine MIME type based on file extension
         file_extension = os.path.splitext(image_path)[1].lower()
-        mime_type = {
-            '.pdf': 'application/pdf',
-            '.png': 'image/png',
-            '.jpg': 'image/jpeg',
-            '.jpeg': 'image/jpeg',
-            '.tiff': 'image/tiff',
-            '.tif': 'image/tiff',
-            '.gif': 'image/gif',
-            '.bmp': 'image/bmp'
-        }.get(file_extension, 'image/png')  # Default to PNG if unknown
+        mime_type = MIME_TYPES.get(file_extension, 'image/png')  # Default to PNG if unknown
         
         log_debug(f"Detected MIME type: {mime_type}", service="docai")
         
@@ -91,7 +113,8 @@ def process_image_with_docai(image_path: str, processor_id: str) -> Tuple[Dict[s
         
         # Extract field data and bounding boxes
         field_data = {}
-        all_vertices = []
+        # Entity vertex coordinates, kept as flat x/y lists for the crop bounds
+        xs, ys = [], []
         
         log_debug("=== EXTRACTING ENTITIES ===", service="docai")
         for entity in document.entities:
@@ -99,10 +122,12 @@ def process_image_with_docai(image_path: str, processor_id: str) -> Tuple[Dict[s
             field_value = entity.mention_text.strip() if entity.mention_text else ""
             confidence = float(entity.confidence) if entity.confidence else 0.0
             
-            log_debug(f"Entity: {field_name}", {
-                "value": field_value,
-                "confidence": confidence
-            }, service="docai")
+            # One log line per entity; debug only
+            if DEBUG_PAYLOADS:
+                log_debug(f"Entity: {field_name}", {
+                    "value": field_value,
+                    "confidence": confidence
+                }, service="docai")
             
             # Extract bounding box coordinates
             bounding_box = []
@@ -118,12 +143,15 @@ def process_image_with_docai(image_path: str, processor_id: str) -> Tuple[Dict[s
                             for vertex in page_ref.bounding_poly.normalized_vertices:
                                 pixel_x = vertex.x * width
                                 pixel_y = vertex.y * height
-                                bounding_box.append([pixel_x, pixel_y])
-                                all_vertices.append((pixel_x, pixel_y))
+                                # Whole pixels are enough for display and keep the stored fields JSON small
+                                bounding_box.append([round(pixel_x), round(pixel_y)])
+                                xs.append(pixel_x)
+                                ys.append(pixel_y)
                         elif page_ref.bounding_poly.vertices:
                             for vertex in page_ref.bounding_poly.vertices:
                                 bounding_box.append([vertex.x, vertex.y])
-                                all_vertices.append((vertex.x, vertex.y))
+                                xs.append(vertex.x)
+                                ys.append(vertex.y)
             
             # Create standardized field data structure
             field_data[field_name] = {
@@ -141,72 +169,89 @@ def process_image_with_docai(image_path: str, processor_id: str) -> Tuple[Dict[s
         log_debug("Extracted fields", list(field_data.keys()), service="docai")
         
         # Crop image based on detected entities
-        cropped_image_path = _crop_image_from_entities(image_path, all_vertices)
+        bounds = (min(xs), min(ys), max(xs), max(ys)) if xs else None
+        cropped_image_path, trimmed_jpeg = _crop_images_from_entities(image_path, bounds, content=content)
         
         log_debug("=== DOCAI PROCESSING COMPLETE ===", service="docai")
         log_debug(f"Cropped image saved to: {cropped_image_path}", service="docai")
         
-        return field_data, cropped_image_path
+        return field_data, cropped_image_path, trimmed_jpeg
         
     except Exception as e:
         log_debug(f"ERROR in DocAI processing: {str(e)}", service="docai")
         raise Exception(f"DocAI processing failed: {str(e)}")
 
-def _crop_image_from_entities(input_path: str, all_vertices: list, percent_expand: float = 0.5) -> str:
+def _expanded_crop_box(bounds: Tuple[float, float, float, float], percent_expand: float, img_width: int, img_height: int) -> Tuple[int, int, int, int]:
+    """
+    Entity bounds (min_x, min_y, max_x, max_y), expanded by percent_expand and clamped to the image
     """
-    Crop image based on bounding box vertices from detected entities
+    min_x, min_y, max_x, max_y = bounds
+    expand_x = (max_x - min_x) * (percent_expand / 2)
+    expand_y = (max_y - min_y) * (percent_expand / 2)
+    return (
+        max(int(min_x - expand_x), 0),
+        max(int(min_y - expand_y), 0),
+        min(int(max_x + expand_x), img_width),
+        min(int(max_y + expand_y), img_height),
+    )
+
+def _crop_images_from_entities(input_path: str, bounds: Optional[Tuple[float, float, float, float]], percent_expand: float = 0.5,
+                               trim_percent_expand: float = 0.30, content: Optional[bytes] = None) -> Tuple[str, Optional[bytes]]:
+    """
+    Produce both crops from a single decode of the input image:
+    - the Gemini crop (percent_expand, original format)
+    - the trimmed review image (trim_percent_expand, EXIF-oriented, portrait, RGB JPEG), encoded in memory
     
     Args:
         input_path: Path to input image
-        all_vertices: List of (x, y) coordinates from all entities
-        percent_expand: Percentage to expand the bounding box
+        bounds: (min_x, min_y, max_x, max_y) over all entity vertices, or None if there were none
+        percent_expand: Percentage to expand the bounding box for the Gemini crop
+        trim_percent_expand: Percentage to expand the bounding box for the trimmed image
+        content: The image bytes already read for DocAI, if available (avoids re-reading input_path)
         
     Returns:
-        Path to cropped image
+        Tuple of (cropped_image_path, trimmed_jpeg_bytes); the crop falls back to input_path and
+        the JPEG to None on failure
     """
     try:
-        if not all_vertices:
-            log_debug("No vertices found, returning original image", service="docai")
-            return input_path
-        
-        # Calculate bounding box
-        xs, ys = zip(*all_vertices)
-        min_x, max_x = min(xs), max(xs)
-        min_y, max_y = min(ys), max(ys)
-        
-        log_debug("Bounding box coordinates", {
-            "min_x": min_x, "max_x": max_x,
-            "min_y": min_y, "max_y": max_y
-        }, service="docai")
-        
-        # Open image and calculate crop area with expansion
-        img = Image.open(input_path)
-        box_width = max_x - min_x
-        box_height = max_y - min_y
-        expand_x = box_width * (percent_expand / 2)
-        expand_y = box_height * (percent_expand / 2)
-        
-        left = max(int(min_x - expand_x), 0)
-        top = max(int(min_y - expand_y), 0)
-        right = min(int(max_x + expand_x), img.width)
-        bottom = min(int(max_y + expand_y), img.height)
-        
-        log_debug("Crop coordinates", {
-            "left": left, "top": top, "right": right, "bottom": bottom
-        }, service="docai")
-        
-        # Crop and save image
-        cropped_img = img.crop((left, top, right, bottom))
-        filename = os.path.basename(input_path)
-        name, ext = os.path.splitext(filename)
-        output_path = os.path.join(TRIMMED_FOLDER, f"{name}_trimmed{ext}")
-        
-        os.makedirs(os.path.dirname(output_path), exist_ok=True)
-        cropped_img.save(output_path)
-        
-        log_debug(f"Image cropped and saved to: {output_path}", service="docai")
-        return output_path
-        
+        img = Image.open(io.BytesIO(content) if content is not None else input_path)
+        img.load()
     except Exception as e:
-        log_debug(f"ERROR in image cropping: {str(e)}", service="docai")
-        return input_path  # Return original if cropping fails 
\ No newline at end of file
+        log_debug(f"ERROR opening image for cropping: {str(e)}", service="docai")
+        return input_path, None
+
+    name, ext = os.path.splitext(os.path.basename(input_path))
+    os.makedirs(TRIMMED_FOLDER, exist_ok=True)
+
+    # Crop for Gemini
+    cropped_image_path = input_path
+    if bounds is None:
+        log_debug("No vertices found, returning original image", service="docai")
+    else:
+        try:
+            crop_box = _expanded_crop_box(bounds, percent_expand, img.width, img.height)
+            log_debug("Crop coordinates", dict(zip(("left", "top", "right", "bottom"), crop_box)), service="docai")
+            output_path = os.path.join(TRIMMED_FOLDER, f"{name}_trimmed{ext}")
+            img.crop(crop_box).save(output_path)
+            cropped_image_path = output_path
+            log_debug(f"Image cropped and saved to: {output_path}", service="docai")
+        except Exception as e:
+            log_debug(f"ERROR in image cropping: {str(e)}", service="docai")
+
+    # Trimmed review image: same vertices, tighter padding, then orientation fixes
+    trimmed_jpeg = None
+    try:
+        trimmed_img = img.crop(_expanded_crop_box(bounds, trim_percent_expand, img.width, img.height)) if bounds is not None else img
+        trimmed_img = apply_exif_orientation(trimmed_img, img.getexif())
+        if trimmed_img.width > trimmed_img.height:
+            trimmed_img = trimmed_img.rotate(90, expand=True)
+        if trimmed_img.mode != 'RGB':
+            trimmed_img = trimmed_img.convert('RGB')
+        buffer = io.BytesIO()
+        trimmed_img.save(buffer, format='JPEG', quality=100, optimize=True)
+        trimmed_jpeg = buffer.getvalue()
+        log_debug(f"Trimmed review image encoded ({len(trimmed_jpeg)} bytes)", service="docai")
+    except Exception as e:
+        log_debug(f"ERROR creating trimmed review image: {str(e)}", service="docai")
+
+    return cropped_image_path, trimmed_jpeg
@@ -5,16 +5,55 @@ from app.repositories.reviewed_data_repository import upsert_reviewed_data
 from app.repositories.extracted_data_repository import get_extracted_data_by_document_id
 import traceback
 import json
+import orjson
 import re
 import time
-from typing import Dict, Any, Tuple, Callable
+from typing import Dict, Any, Optional, Tuple, Callable
 import google.generativeai as genai
 from app.core.gemini_prompt import GEMINI_PROMPT_TEMPLATE
 from app.config import GEMINI_MODEL
-from app.utils.retry_utils import retry_with_exponential_backoff, log_debug
+from app.utils.retry_utils import retry_with_exponential_backoff, log_debug, DEBUG_PAYLOADS
 import mimetypes
+import threading
 
-def process_card_with_gemini_v2(image_path: str, docai_fields: Dict[str, Any], valid_majors: list = None) -> Dict[str, Any]:
+_gemini_model = None
+_gemini_model_lock = threading.Lock()
+
+# Optional markdown code fence around Gemini's JSON answer (```json ... ```), stripped in one pass
+_JSON_FENCE = re.compile(r'^\s*```(?:json)?|```\s*$')
+
+# Images up to this size go inline with generate_content (base64 keeps the request under
+# Gemini's 20MB inline limit); larger ones still go through the File API upload
+INLINE_IMAGE_MAX_BYTES = 10 * 1024 * 1024
+
+# Prompt for schools without majors: mapped_major instructions swapped out (built once at import)
+_NO_MAJORS_PROMPT_TEMPLATE = GEMINI_PROMPT_TEMPLATE.replace(
+    "✅ Always include the mapped_major field.",
+    "✅ Only include fields that are relevant to this card."
+).replace(
+    "**Mapped Major** – Use the provided valid_majors list to match the `mapped_major` to the major on the card. IMPORTANT: Always preserve the original `major` field value exactly as written on the card - do not change or null it out. Only update the separate `mapped_major` field. If no close match exists in valid_majors, leave `mapped_major` blank and explain. If the original `major` field is empty, default `mapped_major` to \"Undecided\".",
+    "**Major Field** – Extract the major exactly as written on the card. Do not modify or map the value."
+)
+
+def get_gemini_model() -> genai.GenerativeModel:
+    """
+    Return the process-wide Gemini model, configuring the SDK on first use.
+    Later jobs reuse the configured client and its connections instead of redoing setup per card.
+    """
+    global _gemini_model
+    if _gemini_model is None:
+        with _gemini_model_lock:
+            if _gemini_model is None:
+                api_key = os.getenv("GEMINI_API_KEY")
+                log_debug(f"GEMINI_API_KEY present: {bool(api_key)}", service="gemini")
+                if not api_key:
+                    raise Exception("GEMINI_API_KEY not found in environment variables")
+                genai.configure(api_key=api_key)
+                _gemini_model = genai.GenerativeModel("gemini-1.5-pro-latest")
+                log_debug("Gemini configured and model initialized", service="gemini")
+    return _gemini_model
+
+def process_card_with_gemini_v2(image_path: str, docai_fields: Dict[str, Any], valid_majors: list = None, image_bytes: Optional[bytes] = None) -> Dict[str, Any]:
     """
     Enhanced Gemini processing that uses quality indicators instead of confidence self-assessment
     
@@ -22,20 +61,23 @@ def process_card_with_gemini_v2(image_path: str, docai_fields: Dict[str, Any], v
         image_path: Path to the cropped image
         docai_fields: Fields from DocAI with requirements applied
         valid_majors: List of valid majors for mapped_major logic
+        image_bytes: Image contents already in memory (at most INLINE_IMAGE_MAX_BYTES); sent inline instead of reading image_path
         
     Returns:
         Enhanced field data with computed confidence scores
     """
     log_debug("=== GEMINI PROCESSING V2 START ===", service="gemini")
     log_debug(f"Image path: {image_path}", service="gemini")
-    log_debug("Input DocAI fields", {
-        field_name: {
-            "value": field_data.get("value", ""),
-            "required": field_data.get("required", False),
-            "enabled": field_data.get("enabled", True)
-        }
-        for field_name, field_data in docai_fields.items()
-    }, service="gemini")
+    # Per-field snapshots are only built when they will be logged in full
+    if DEBUG_PAYLOADS:
+        log_debug("Input DocAI fields", {
+            field_name: {
+                "value": field_data.get("value", ""),
+                "required": field_data.get("required", False),
+                "enabled": field_data.get("enabled", True)
+            }
+            for field_name, field_data in docai_fields.items()
+        }, service="gemini")
     
     # Track critical fields before processing
     critical_fields = ["cell", "date_of_birth"]
@@ -51,19 +93,8 @@ def process_card_with_gemini_v2(image_path: str, docai_fields: Dict[str, Any], v
     if valid_majors is None:
         valid_majors = []
     try:
-        # Configure Gemini
-        api_key = os.getenv("GEMINI_API_KEY")
-        log_debug(f"GEMINI_API_KEY present: {bool(api_key)}", service="gemini")
-        if not api_key:
-            raise Exception("GEMINI_API_KEY not found in environment variables")
-            
-        log_debug("Configuring Gemini with API key...", service="gemini")
-        genai.configure(api_key=api_key)
-        log_debug("Gemini configured successfully", service="gemini")
-        
-        log_debug("Initializing Gemini model...", service="gemini")
-        model = genai.GenerativeModel("gemini-1.5-pro-latest")
-        log_debug("Gemini model initialized successfully", service="gemini")
+        # Configured once per process; the model is shared by all jobs
+        model = get_gemini_model()
         
         # Prepare input for Gemini (fields + valid_majors)
         log_debug("Preparing input for Gemini...", service="gemini")
@@ -92,24 +123,19 @@ def process_card_with_gemini_v2(image_path: str, docai_fields: Dict[str, Any], v
         # Create prompt
         log_debug("Creating prompt for Gemini...", service="gemini")
         
-        # Conditionally modify prompt based on whether school has majors
+        # Conditionally modify prompt based on whether school has majors.
+        # Compact JSON keeps the prompt small; str.format inserts arguments verbatim, so braces need no escaping.
+        all_fields_json = json.dumps(gemini_input["fields"])
         if valid_majors:
             # Use full prompt with mapped_major instructions
             prompt = GEMINI_PROMPT_TEMPLATE.format(
-                all_fields_json=json.dumps(gemini_input["fields"], indent=2).replace("{", "{{").replace("}", "}}"),
-                list_of_valid_majors=json.dumps(valid_majors, indent=2).replace("{", "{{").replace("}", "}}")
+                all_fields_json=all_fields_json,
+                list_of_valid_majors=json.dumps(valid_majors)
             )
         else:
             # Use modified prompt without mapped_major instructions
-            modified_template = GEMINI_PROMPT_TEMPLATE.replace(
-                "✅ Always include the mapped_major field.", 
-                "✅ Only include fields that are relevant to this card."
-            ).replace(
-                "**Mapped Major** – Use the provided valid_majors list to match the `mapped_major` to the major on the card. IMPORTANT: Always preserve the original `major` field value exactly as written on the card - do not change or null it out. Only update the separate `mapped_major` field. If no close match exists in valid_majors, leave `mapped_major` blank and explain. If the original `major` field is empty, default `mapped_major` to \"Undecided\".",
-                "**Major Field** – Extract the major exactly as written on the card. Do not modify or map the value."
-            )
-            prompt = modified_template.format(
-                all_fields_json=json.dumps(gemini_input["fields"], indent=2).replace("{", "{{").replace("}", "}}"),
+            prompt = _NO_MAJORS_PROMPT_TEMPLATE.format(
+                all_fields_json=all_fields_json,
                 list_of_valid_majors="[]"
             )
         
@@ -138,19 +164,28 @@ def process_card_with_gemini_v2(image_path: str, docai_fields: Dict[str, Any], v
         
         log_debug(f"Detected MIME type: {mime_type} for file: {image_path}", service="gemini")
         
-        try:
-            log_debug("Attempting to upload file to Gemini...", service="gemini")
-            uploaded_file = retry_with_exponential_backoff(
-                func=lambda: genai.upload_file(image_path, mime_type=mime_type),
-                max_retries=3,
-                operation_name="Gemini image upload",
-                service="gemini"
-            )
-            log_debug("Image uploaded successfully to Gemini", service="gemini")
-        except Exception as e:
-            log_debug(f"Failed to upload image to Gemini: {str(e)}", service="gemini")
-            log_debug("Full traceback:", traceback.format_exc(), service="gemini")
-            raise
+        if image_bytes is None and os.path.getsize(image_path) <= INLINE_IMAGE_MAX_BYTES:
+            with open(image_path, 'rb') as f:
+                image_bytes = f.read()
+        
+        if image_bytes is not None:
+            # Small images go inline with the request, saving the separate upload round trip per card
+            uploaded_file = {"mime_type": mime_type, "data": image_bytes}
+            log_debug(f"Sending {len(image_bytes)} image bytes inline", service="gemini")
+        else:
+            try:
+                log_debug("Attempting to upload file to Gemini...", service="gemini")
+                uploaded_file = retry_with_exponential_backoff(
+                    func=lambda: genai.upload_file(image_path, mime_type=mime_type),
+                    max_retries=3,
+                    operation_name="Gemini image upload",
+                    service="gemini"
+                )
+                log_debug("Image uploaded successfully to Gemini", service="gemini")
+            except Exception as e:
+                log_debug(f"Failed to upload image to Gemini: {str(e)}", service="gemini")
+                log_debug("Full traceback:", traceback.format_exc(), service="gemini")
+                raise
         
         log_debug("Sending request to Gemini...", service="gemini")
         log_debug("Prompt being sent:", prompt, service="gemini")
@@ -177,13 +212,15 @@ def process_card_with_gemini_v2(image_path: str, docai_fields: Dict[str, Any], v
         log_debug("Raw Gemini response", response.text, service="gemini")
         
         # 🔍 TRACK CRITICAL FIELDS: Log raw response for critical fields
-        log_debug("🔍 RAW GEMINI RESPONSE - SEARCHING FOR CRITICAL FIELDS", {
-            "cell_in_response": "cell" in response.text.lower(),
-            "date_of_birth_in_response": "date_of_birth" in response.text.lower(),
-            "birthday_in_response": "birthday" in response.text.lower(),
-            "phone_in_response": "phone" in response.text.lower(),
-            "response_length": len(response.text)
-        }, service="gemini")
+        # Lower-cases the whole response four times; debug only
+        if DEBUG_PAYLOADS:
+            log_debug("🔍 RAW GEMINI RESPONSE - SEARCHING FOR CRITICAL FIELDS", {
+                "cell_in_response": "cell" in response.text.lower(),
+                "date_of_birth_in_response": "date_of_birth" in response.text.lower(),
+                "birthday_in_response": "birthday" in response.text.lower(),
+                "phone_in_response": "phone" in response.text.lower(),
+                "response_length": len(response.text)
+            }, service="gemini")
         
         # Parse response with quality indicators
         try:
@@ -232,15 +269,17 @@ def process_card_with_gemini_v2(image_path: str, docai_fields: Dict[str, Any], v
             log_debug("Response that caused error:", response.text, service="gemini")
             raise
         
-        log_debug("Enhanced fields created", {
-            field_name: {
-                "value": field_data.get("value", ""),
-                "confidence_score": field_data.get("review_confidence", 0.0),
-                "requires_review": field_data.get("requires_human_review", False),
-                "review_notes": field_data.get("review_notes", "")
-            }
-            for field_name, field_data in enhanced_fields.items()
-        }, service="gemini")
+        # Per-field snapshots are only built when they will be logged in full
+        if DEBUG_PAYLOADS:
+            log_debug("Enhanced fields created", {
+                field_name: {
+                    "value": field_data.get("value", ""),
+                    "confidence_score": field_data.get("review_confidence", 0.0),
+                    "requires_review": field_data.get("requires_human_review", False),
+                    "review_notes": field_data.get("review_notes", "")
+                }
+                for field_name, field_data in enhanced_fields.items()
+            }, service="gemini")
         
         # 🔍 TRACK CRITICAL FIELDS: Final output summary
         log_debug("🔍 CRITICAL FIELDS - FINAL GEMINI OUTPUT", {
@@ -287,27 +326,24 @@ def parse_gemini_quality_response(response_text: str, docai_fields: Dict[str, An
     
     try:
         # Clean the response text by removing markdown code block markers
-        cleaned_text = response_text.strip()
-        if cleaned_text.startswith("```json"):
-            cleaned_text = cleaned_text[7:]  # Remove ```json
-        elif cleaned_text.startswith("```"):
-            cleaned_text = cleaned_text[3:]   # Remove ```
-        if cleaned_text.endswith("```"):
-            cleaned_text = cleaned_text[:-3]  # Remove trailing ```
-        cleaned_text = cleaned_text.strip()
+        # (orjson ignores the surrounding whitespace)
+        cleaned_text = _JSON_FENCE.sub("", response_text)
         
         log_debug("Cleaned response text for parsing", cleaned_text, service="gemini")
         
         # 🔍 TRACK CRITICAL FIELDS: Check if fields exist in cleaned text
-        log_debug("🔍 PARSER - CRITICAL FIELDS IN CLEANED TEXT", {
-            "cell_in_cleaned": "cell" in cleaned_text.lower(),
-            "date_of_birth_in_cleaned": "date_of_birth" in cleaned_text.lower(),
-            "cleaned_text_length": len(cleaned_text),
-            "cleaned_text_preview": cleaned_text[:500] + "..." if len(cleaned_text) > 500 else cleaned_text
-        }, service="gemini")
+        # Lower-cases the whole response twice; debug only
+        if DEBUG_PAYLOADS:
+            log_debug("🔍 PARSER - CRITICAL FIELDS IN CLEANED TEXT", {
+                "cell_in_cleaned": "cell" in cleaned_text.lower(),
+                "date_of_birth_in_cleaned": "date_of_birth" in cleaned_text.lower(),
+                "cleaned_text_length": len(cleaned_text),
+                "cleaned_text_preview": cleaned_text[:500] + "..." if len(cleaned_text) > 500 else cleaned_text
+            }, service="gemini")
         
         # Parse the response text into a dictionary
-        gemini_data = json.loads(cleaned_text)
+        # (orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers' handlers still apply)
+        gemini_data = orjson.loads(cleaned_text)
         log_debug("Parsed Gemini response", gemini_data, service="gemini")
         
         # 🔍 TRACK CRITICAL FIELDS: Check if fields exist in parsed JSON
@@ -1,71 +1,76 @@
 import json
+import re
 from datetime import datetime, timezone
 from typing import Dict, Any, Tuple, List
 from app.utils.retry_utils import log_debug
 # Removed import: get_field_consolidation_mapping - no longer using canonicalization
 
-def determine_review_status(fields: Dict[str, Any]) -> Tuple[str, List[str]]:
+# Field names (all variations) whose values get phone / date formatting
+_PHONE_FIELDS = frozenset(["cell", "cell_phone", "phone", "phone_number", "mobile", "mobile_phone", "cellphone"])
+_DATE_FIELDS = frozenset(["date_of_birth", "birthdate", "dob", "birth_date", "birthday"])
+_NON_DIGIT = re.compile(r'\D')
+# Accepted date formats, compiled once; the flag marks year-first (YYYY-MM-DD) patterns
+_DATE_PATTERNS = [
+    (re.compile(r'(\d{1,2})/(\d{1,2})/(\d{4})'), False),  # MM/DD/YYYY or M/D/YYYY
+    (re.compile(r'(\d{1,2})-(\d{1,2})-(\d{4})'), False),  # MM-DD-YYYY or M-D-YYYY
+    (re.compile(r'(\d{1,2})\.(\d{1,2})\.(\d{4})'), False), # MM.DD.YYYY or M.D.YYYY
+    (re.compile(r'(\d{4})-(\d{1,2})-(\d{1,2})'), True),   # YYYY-MM-DD
+]
+
+def _field_needs_review(field_name: str, field_data: Any) -> bool:
     """
-    Single function to determine if card needs review based on field analysis
-    
-    Args:
-        fields: Field data with all metadata
-        
-    Returns:
-        Tuple of (review_status, list_of_fields_needing_review)
+    Apply the review rules to one field (flagging it in place). Returns True if it needs human review.
+    Only enabled, required fields can need review; review flags are cleared on non-required fields.
     """
-    log_debug("=== DETERMINING REVIEW STATUS ===", service="review")
-    
-    fields_needing_review = []
-    
-    # Check each field for review requirements
-    for field_name, field_data in fields.items():
-        if not isinstance(field_data, dict):
-            continue
-            
-        # Skip disabled fields
-        if not field_data.get("enabled", True):
-            continue
-            
-        # Only process required fields
-        if not field_data.get("required", False):
-            # Clear any review flags for non-required fields
-            field_data["requires_human_review"] = False
-            field_data["review_notes"] = ""
-            continue
-            
-        # Check if field is explicitly marked for review
-        if field_data.get("requires_human_review", False):
-            fields_needing_review.append(field_name)
-            log_debug(f"Field {field_name} explicitly marked for review", {
-                "reason": field_data.get("review_notes", "No reason provided")
-            }, service="review")
-            continue
-            
-        # Check required field rules
-        field_value = field_data.get("value", "")
-        confidence = field_data.get("confidence", 0.0)
-        review_confidence = field_data.get("review_confidence", 0.0)
+    if not isinstance(field_data, dict):
+        return False
         
-        # Use the higher of the two confidence scores
-        effective_confidence = max(confidence, review_confidence)
+    # Skip disabled fields
+    if not field_data.get("enabled", True):
+        return False
         
-        # Required field is empty
-        if not field_value or field_value.strip() == "":
-            fields_needing_review.append(field_name)
-            field_data["requires_human_review"] = True
-            field_data["review_notes"] = "Required field is empty"
-            log_debug(f"Field {field_name} marked for review: empty required field", service="review")
-            continue
-            
-        # Required field has low confidence
-        if effective_confidence < 0.7:
-            fields_needing_review.append(field_name)
-            field_data["requires_human_review"] = True
-            field_data["review_notes"] = f"Required field has low confidence ({effective_confidence:.2f})"
-            log_debug(f"Field {field_name} marked for review: low confidence", service="review")
-            continue
-    
+    # Only process required fields
+    if not field_data.get("required", False):
+        # Clear any review flags for non-required fields
+        field_data["requires_human_review"] = False
+        field_data["review_notes"] = ""
+        return False
+        
+    # Check if field is explicitly marked for review
+    if field_data.get("requires_human_review", False):
+        log_debug(f"Field {field_name} explicitly marked for review", {
+            "reason": field_data.get("review_notes", "No reason provided")
+        }, service="review")
+        return True
+        
+    # Check required field rules
+    field_value = field_data.get("value", "")
+    confidence = field_data.get("confidence", 0.0)
+    review_confidence = field_data.get("review_confidence", 0.0)
+    
+    # Use the higher of the two confidence scores
+    effective_confidence = max(confidence, review_confidence)
+    
+    # Required field is empty
+    if not field_value or field_value.strip() == "":
+        field_data["requires_human_review"] = True
+        field_data["review_notes"] = "Required field is empty"
+        log_debug(f"Field {field_name} marked for review: empty required field", service="review")
+        return True
+        
+    # Required field has low confidence
+    if effective_confidence < 0.7:
+        field_data["requires_human_review"] = True
+        field_data["review_notes"] = f"Required field has low confidence ({effective_confidence:.2f})"
+        log_debug(f"Field {field_name} marked for review: low confidence", service="review")
+        return True
+    
+    return False
+
+def _review_status(fields_needing_review: List[str]) -> Tuple[str, List[str]]:
+    """
+    Final review status for a card given the fields flagged for review
+    """
     # Determine final status
     if fields_needing_review:
         review_status = "needs_human_review"
@@ -81,6 +86,27 @@ def determine_review_status(fields: Dict[str, Any]) -> Tuple[str, List[str]]:
     
     return review_status, fields_needing_review
 
+def determine_review_status(fields: Dict[str, Any]) -> Tuple[str, List[str]]:
+    """
+    Single function to determine if card needs review based on field analysis
+    
+    Args:
+        fields: Field data with all metadata
+        
+    Returns:
+        Tuple of (review_status, list_of_fields_needing_review)
+    """
+    log_debug("=== DETERMINING REVIEW STATUS ===", service="review")
+    
+    fields_needing_review = []
+    
+    # Check each field for review requirements
+    for field_name, field_data in fields.items():
+        if _field_needs_review(field_name, field_data):
+            fields_needing_review.append(field_name)
+    
+    return _review_status(fields_needing_review)
+
 # canonicalize_fields function removed - DocAI field names now flow through unchanged
 
 def validate_field_data(fields: Dict[str, Any]) -> Dict[str, Any]:
@@ -108,36 +134,7 @@ def validate_field_data(fields: Dict[str, Any]) -> Dict[str, Any]:
     }, service="review")
     
     for field_name, field_data in fields.items():
-        if not isinstance(field_data, dict):
-            continue
-            
-        field_value = field_data.get("value", "")
-        original_value = field_value
-        
-        # Clean up common issues
-        if field_value:
-            # Remove "N/A" values (only for string values)
-            if isinstance(field_value, str) and field_value.upper() in ["N/A", "NA", "NONE", "NULL"]:
-                field_data["value"] = ""
-                log_debug(f"Cleaned N/A value from {field_name}", service="review")
-                
-                # 🔍 TRACK CRITICAL FIELDS: Log N/A cleaning
-                if field_name in critical_fields:
-                    log_debug(f"🔍 CRITICAL FIELD {field_name} CLEANED N/A: '{original_value}' -> ''", service="review")
-                
-            # Validate phone format (handles all phone field variations)
-            elif field_name in ["cell", "cell_phone", "phone", "phone_number", "mobile", "mobile_phone", "cellphone"] and field_value:
-                cleaned_phone = _validate_phone_format(field_value)
-                if cleaned_phone != field_value:
-                    field_data["value"] = cleaned_phone
-                    log_debug(f"Formatted phone: {field_value} -> {cleaned_phone}", service="review")
-                    
-            # Validate date format (handles all date field variations) 
-            elif field_name in ["date_of_birth", "birthdate", "dob", "birth_date", "birthday"] and field_value:
-                cleaned_date = _validate_date_format(field_value)
-                if cleaned_date != field_value:
-                    field_data["value"] = cleaned_date
-                    log_debug(f"Formatted date: {field_value} -> {cleaned_date}", service="review")
+        _validate_field(field_name, field_data, critical_fields)
     
     # 🔍 TRACK CRITICAL FIELDS: Log final state
     log_debug("🔍 CRITICAL FIELDS AFTER VALIDATION", {
@@ -153,12 +150,66 @@ def validate_field_data(fields: Dict[str, Any]) -> Dict[str, Any]:
     log_debug("Field validation complete (canonicalization REMOVED)", service="review")
     return fields
 
+def _validate_field(field_name: str, field_data: Any, critical_fields: List[str] = None) -> None:
+    """
+    Clean one field's value in place (N/A values, phone and date formats)
+    """
+    if not isinstance(field_data, dict):
+        return
+        
+    field_value = field_data.get("value", "")
+    original_value = field_value
+    
+    # Clean up common issues
+    if field_value:
+        # Remove "N/A" values (only for string values)
+        if isinstance(field_value, str) and field_value.upper() in ["N/A", "NA", "NONE", "NULL"]:
+            field_data["value"] = ""
+            log_debug(f"Cleaned N/A value from {field_name}", service="review")
+            
+            # 🔍 TRACK CRITICAL FIELDS: Log N/A cleaning
+            if critical_fields and field_name in critical_fields:
+                log_debug(f"🔍 CRITICAL FIELD {field_name} CLEANED N/A: '{original_value}' -> ''", service="review")
+            
+        # Validate phone format (handles all phone field variations)
+        elif field_name in _PHONE_FIELDS and field_value:
+            cleaned_phone = _validate_phone_format(field_value)
+            if cleaned_phone != field_value:
+                field_data["value"] = cleaned_phone
+                log_debug(f"Formatted phone: {field_value} -> {cleaned_phone}", service="review")
+                
+        # Validate date format (handles all date field variations) 
+        elif field_name in _DATE_FIELDS and field_value:
+            cleaned_date = _validate_date_format(field_value)
+            if cleaned_date != field_value:
+                field_data["value"] = cleaned_date
+                log_debug(f"Formatted date: {field_value} -> {cleaned_date}", service="review")
+
+def validate_and_review(fields: Dict[str, Any]) -> Tuple[Dict[str, Any], str, List[str]]:
+    """
+    validate_field_data + determine_review_status in a single walk over the fields
+    
+    Args:
+        fields: Field data to validate
+        
+    Returns:
+        Tuple of (validated_fields, review_status, list_of_fields_needing_review)
+    """
+    log_debug("=== VALIDATING FIELDS AND DETERMINING REVIEW STATUS ===", service="review")
+    
+    fields_needing_review = []
+    for field_name, field_data in fields.items():
+        _validate_field(field_name, field_data)
+        if _field_needs_review(field_name, field_data):
+            fields_needing_review.append(field_name)
+    
+    review_status, fields_needing_review = _review_status(fields_needing_review)
+    return fields, review_status, fields_needing_review
+
 def _validate_phone_format(phone: str) -> str:
     """Validate and clean phone format"""
-    import re
-    
     # Remove all non-digit characters
-    digits = re.sub(r'\D', '', phone)
+    digits = _NON_DIGIT.sub('', phone)
     
     # Format as xxx-xxx-xxxx if we have 10 digits
     if len(digits) == 10:
@@ -172,22 +223,13 @@ def _validate_phone_format(phone: str) -> str:
 
 def _validate_date_format(date_str: str) -> str:
     """Validate and clean date format"""
-    import re
-    from datetime import datetime
-    
     # Try to parse various date formats and convert to MM/DD/YYYY
-    date_patterns = [
-        r'(\d{1,2})/(\d{1,2})/(\d{4})',  # MM/DD/YYYY or M/D/YYYY
-        r'(\d{1,2})-(\d{1,2})-(\d{4})',  # MM-DD-YYYY or M-D-YYYY
-        r'(\d{1,2})\.(\d{1,2})\.(\d{4})', # MM.DD.YYYY or M.D.YYYY
-        r'(\d{4})-(\d{1,2})-(\d{1,2})',  # YYYY-MM-DD
-    ]
-    
-    for pattern in date_patterns:
-        match = re.match(pattern, date_str.strip())
+    date_str_stripped = date_str.strip()
+    for pattern, year_first in _DATE_PATTERNS:
+        match = pattern.match(date_str_stripped)
         if match:
             try:
-                if pattern.startswith(r'(\d{4})'):  # YYYY-MM-DD format
+                if year_first:  # YYYY-MM-DD format
                     year, month, day = match.groups()
                 else:  # MM/DD/YYYY format
                     month, day, year = match.groups()
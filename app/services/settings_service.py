@@ -1,10 +1,62 @@
 import json
+import threading
 from datetime import datetime, timezone
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Tuple
+from cachetools import TTLCache, cached
+from cachetools.keys import hashkey
 from app.core.clients import supabase_client
-from app.utils.retry_utils import log_debug
+from app.config import DOCAI_PROCESSOR_ID
+from app.utils.retry_utils import log_debug, DEBUG_PAYLOADS
 from app.utils.field_utils import get_combined_fields_to_exclude, generate_field_label
 
+# Per-school processor id, field requirements and majors, shared by every job from the same school
+school_config_cache = TTLCache(maxsize=512, ttl=60)
+_school_config_lock = threading.Lock()
+
+def card_fields_to_requirements(card_fields_array: List[Dict[str, Any]]) -> Dict[str, Dict[str, bool]]:
+    """
+    Convert the schools.card_fields array to a requirements dict, dropping combined fields
+    """
+    combined_fields = get_combined_fields_to_exclude()
+    return {
+        f["key"]: {"enabled": f.get("enabled", True), "required": f.get("required", False)}
+        for f in card_fields_array if f["key"] not in combined_fields
+    }
+
+@cached(school_config_cache, lock=_school_config_lock)
+def get_school_config(school_id: str) -> Tuple[str, Dict[str, Dict[str, bool]], List[str]]:
+    """
+    Get (docai_processor_id, field_requirements, majors) for a school in one query, cached for 60s
+    """
+    school_query = supabase_client.table("schools").select("docai_processor_id, card_fields, majors").eq("id", school_id).maybe_single().execute()
+    if not (school_query and school_query.data):
+        log_debug(f"No school settings found for {school_id}, using default processor", service="settings")
+        return DOCAI_PROCESSOR_ID, {}, []
+
+    processor_id = school_query.data.get("docai_processor_id") or DOCAI_PROCESSOR_ID
+    field_requirements = card_fields_to_requirements(school_query.data.get("card_fields") or [])
+    majors = school_query.data.get("majors") or []
+    log_debug(f"Loaded school config for {school_id} (processor: {processor_id}, {len(majors)} majors)", field_requirements, service="settings")
+    return processor_id, field_requirements, majors
+
+def invalidate_school_config(school_id: str) -> None:
+    """
+    Drop a school's cached config after its card_fields change
+    """
+    with _school_config_lock:
+        school_config_cache.pop(hashkey(school_id), None)
+
+def field_requirements_in_sync(requirements: Dict[str, Dict[str, bool]], majors: List[str], detected_fields) -> bool:
+    """
+    True when sync_field_requirements would have nothing to add for these detected fields,
+    so the school's current requirements can be used without another round trip
+    """
+    combined_fields = get_combined_fields_to_exclude()
+    if any(f not in requirements and f not in combined_fields for f in detected_fields):
+        return False
+    # mapped_major is kept in card_fields exactly when the school has majors
+    return bool(majors) == ("mapped_major" in requirements)
+
 def get_field_requirements(school_id: str) -> Dict[str, Dict[str, bool]]:
     """
     Get field requirements from school settings (now as an array)
@@ -110,11 +162,13 @@ def apply_field_requirements(fields: Dict[str, Any], requirements: Dict[str, Dic
                     "new_value": field_data.get("value", "")
                 }, service="settings")
             
-            log_debug(f"Updated {field_name}", {
-                "enabled": field_data["enabled"],
-                "required": field_data["required"],
-                "value_preserved": bool(original_value)
-            }, service="settings")
+            # One log line per field; debug only
+            if DEBUG_PAYLOADS:
+                log_debug(f"Updated {field_name}", {
+                    "enabled": field_data["enabled"],
+                    "required": field_data["required"],
+                    "value_preserved": bool(original_value)
+                }, service="settings")
         else:
             # Default settings for fields not in requirements
             field_data["enabled"] = True
@@ -164,8 +218,8 @@ def sync_field_requirements(school_id: str, detected_fields: list) -> Dict[str,
         # Initialize updated flag
         updated = False
         
-        # Get current school settings as array
-        school_query = supabase_client.table("schools").select("card_fields").eq("id", school_id).maybe_single().execute()
+        # Get current school settings as array (and majors, in the same query)
+        school_query = supabase_client.table("schools").select("card_fields, majors").eq("id", school_id).maybe_single().execute()
         card_fields_array = school_query.data.get("card_fields") or []
         
         # Get existing field keys
@@ -200,8 +254,7 @@ def sync_field_requirements(school_id: str, detected_fields: list) -> Dict[str,
 
 
         # Conditionally add mapped_major if school has majors configured
-        majors_query = supabase_client.table("schools").select("majors").eq("id", school_id).maybe_single().execute()
-        school_has_majors = bool(majors_query and majors_query.data and majors_query.data.get("majors"))
+        school_has_majors = bool(school_query.data.get("majors"))
         
         mapped_major_exists = "mapped_major" in existing_keys or "mapped_major" in [f["key"] for f in card_fields_array]
         
@@ -226,6 +279,7 @@ def sync_field_requirements(school_id: str, detected_fields: list) -> Dict[str,
                 "card_fields": card_fields_array
             }
             result = supabase_client.table("schools").update(update_payload).eq("id", school_id).execute()
+            invalidate_school_config(school_id)
             if result.data:
                 log_debug("Successfully updated school settings in database", service="settings")
             else:
@@ -292,9 +346,10 @@ def sync_field_types_and_options(school_id: str, detected_field_info: Dict[str,
                 if detected_type in ["select", "checkbox"] and detected_options:
                     current_options = field_config.get("options", [])
                     # Merge new options with existing ones (preserve user customizations)
-                    merged_options = list(set(current_options + detected_options))
+                    # Sort for consistency (and so an unchanged set compares equal and skips the write)
+                    merged_options = sorted(set(current_options) | set(detected_options))
                     if merged_options != current_options:
-                        field_config["options"] = sorted(merged_options)  # Sort for consistency
+                        field_config["options"] = merged_options
                         updated = True
                         log_debug(f"Updated options for {field_key}: {merged_options}", service="settings")
         
@@ -327,6 +382,7 @@ def sync_field_types_and_options(school_id: str, detected_field_info: Dict[str,
                 "card_fields": card_fields_array
             }
             supabase_client.table("schools").update(update_payload).eq("id", school_id).execute()
+            invalidate_school_config(school_id)
             log_debug("Updated school card_fields with type information", service="settings")
         
         # Return as dict for internal use
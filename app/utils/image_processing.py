@@ -14,8 +14,9 @@ def trim_image_with_docai(input_path: str, output_path: str = None, percent_expa
             filename = os.path.basename(input_path)
             name, ext = os.path.splitext(filename)
             output_path = os.path.join(TRIMMED_FOLDER, f"{name}_trimmed{ext}")
-        # Set up Document AI client
-        client = documentai.DocumentProcessorServiceClient()
+        # Shared Document AI client (imported here: docai_service imports this module)
+        from app.services.docai_service import get_docai_client
+        client = get_docai_client()
         name = f"projects/{PROJECT_ID}/locations/{DOCAI_LOCATION}/processors/{DOCAI_PROCESSOR_ID}"
         with open(input_path, "rb") as image_file:
             image_content = image_file.read()
@@ -24,7 +25,7 @@ def trim_image_with_docai(input_path: str, output_path: str = None, percent_expa
         result = client.process_document(request=request)
         document = result.document
         # Gather all bounding box vertices from entities
-        all_vertices = []
+        xs, ys = [], []
         for entity in getattr(document, "entities", []):
             if entity.page_anchor and entity.page_anchor.page_refs:
                 for page_ref in entity.page_anchor.page_refs:
@@ -36,14 +37,15 @@ def trim_image_with_docai(input_path: str, output_path: str = None, percent_expa
                         for v in page_ref.bounding_poly.normalized_vertices:
                             pixel_x = v.x * width
                             pixel_y = v.y * height
-                            all_vertices.append((pixel_x, pixel_y))
+                            xs.append(pixel_x)
+                            ys.append(pixel_y)
                     elif page_ref.bounding_poly.vertices:
                         for v in page_ref.bounding_poly.vertices:
-                            all_vertices.append((v.x, v.y))
-        if not all_vertices:
+                            xs.append(v.x)
+                            ys.append(v.y)
+        if not xs:
             print("No bounding box vertices found for any entity. Returning original image.")
             return input_path
-        xs, ys = zip(*all_vertices)
         min_x, max_x = min(xs), max(xs)
         min_y, max_y = min(ys), max(ys)
         # Crop with percent expansion
@@ -58,13 +60,38 @@ def trim_image_with_docai(input_path: str, output_path: str = None, percent_expa
         bottom = min(int(max_y + expand_y), img.height)
         cropped_img = img.crop((left, top, right, bottom))
         os.makedirs(os.path.dirname(output_path), exist_ok=True)
-        cropped_img.save(output_path)
+        if os.path.splitext(output_path)[1].lower() in ('.jpg', '.jpeg'):
+            # High quality RGB JPEG, written directly so callers don't have to re-encode the crop
+            if cropped_img.mode != 'RGB':
+                cropped_img = cropped_img.convert('RGB')
+            cropped_img.save(output_path, format='JPEG', quality=100, optimize=True)
+        else:
+            cropped_img.save(output_path)
         print(f"[DocAI] Cropped image saved to {output_path}")
         return output_path
     except Exception as e:
         print(f"[DocAI] Error in trim_image_with_docai: {e}")
         return input_path
 
+# EXIF orientation tag -> transpose that undoes it (same mapping as ImageOps.exif_transpose)
+EXIF_ORIENTATION_TRANSPOSE = {
+    2: Image.Transpose.FLIP_LEFT_RIGHT,
+    3: Image.Transpose.ROTATE_180,
+    4: Image.Transpose.FLIP_TOP_BOTTOM,
+    5: Image.Transpose.TRANSPOSE,
+    6: Image.Transpose.ROTATE_270,
+    7: Image.Transpose.TRANSVERSE,
+    8: Image.Transpose.ROTATE_90,
+}
+
+def apply_exif_orientation(img: Image.Image, exif: Image.Exif) -> Image.Image:
+    """
+    Apply the orientation recorded in `exif` (usually the source image's EXIF) to `img`,
+    which may be a crop of that source and so no longer carry the EXIF itself.
+    """
+    method = EXIF_ORIENTATION_TRANSPOSE.get(exif.get(ExifTags.Base.Orientation, 1))
+    return img.transpose(method) if method is not None else img
+
 def ensure_vertical_orientation(image_path: str) -> str:
     """
     Properly handle EXIF orientation using Pillow's modern ImageOps method,
@@ -83,7 +110,7 @@ def ensure_vertical_orientation(image_path: str) -> str:
         print(f"✅ Additional rotation applied to ensure portrait orientation")
     
     # Convert to RGB if needed
-    if img.mode in ('RGBA', 'LA', 'P'):
+    if img.mode != 'RGB':
         img = img.convert('RGB')
         
     # Save processed image
@@ -96,27 +123,20 @@ def ensure_vertical_orientation(image_path: str) -> str:
 def ensure_trimmed_image(original_image_path: str) -> str:
     print(f"🔄 Processing image: {original_image_path}")
     try:
-        # Ensure vertical orientation first
+        # Ensure vertical orientation first (always an RGB JPEG)
         vertical_path = ensure_vertical_orientation(original_image_path)
         
-        # Open image with high quality settings
-        img = Image.open(vertical_path)
-        
-        # Save with high quality
-        trimmed_path = trim_image_with_docai(vertical_path, percent_expand=0.30)
+        # Trim straight to a high quality RGB JPEG, so the crop is decoded and encoded only once;
+        # if trimming fails the vertical image is already in that format
+        name = os.path.splitext(os.path.basename(vertical_path))[0]
+        jpeg_path = os.path.join(TRIMMED_FOLDER, f"{name}_trimmed.jpg")
+        trimmed_path = trim_image_with_docai(vertical_path, output_path=jpeg_path, percent_expand=0.30)
         if not os.path.exists(trimmed_path):
             print(f"⚠️ Trimmed image not found at: {trimmed_path}")
             return original_image_path
             
-        # Ensure high quality output and always save as JPEG (RGB)
-        output_img = Image.open(trimmed_path)
-        if output_img.mode != 'RGB':
-            output_img = output_img.convert('RGB')
-        # Always save as .jpg
-        jpeg_path = os.path.splitext(trimmed_path)[0] + '.jpg'
-        output_img.save(jpeg_path, format='JPEG', quality=100, optimize=True)
-        print(f"✅ Image processed and saved at: {jpeg_path}")
-        return jpeg_path
+        print(f"✅ Image processed and saved at: {trimmed_path}")
+        return trimmed_path
     except Exception as e:
         print(f"❌ Error processing image: {e}")
         return original_image_path 
\ No newline at end of file
@@ -0,0 +1,28 @@
+import asyncio
+
+_MISSING = object()
+
+
+class UnsupportedRealtimeClient(RuntimeError):
+    """The installed realtime client no longer exposes the listen task hold_realtime_connection waits on."""
+
+
+async def hold_realtime_connection(realtime) -> None:
+    """
+    Block for as long as a Realtime socket stays connected.
+    realtime-py 2.x reads the socket on its own listen task (its listen() is a deprecated no-op)
+    and replaces that task when it auto-reconnects, so follow it until the connection is gone.
+    Raises UnsupportedRealtimeClient if the client has no such task (a realtime upgrade changed it).
+    """
+    if getattr(realtime, "_listen_task", _MISSING) is _MISSING:
+        raise UnsupportedRealtimeClient(
+            f"{type(realtime).__name__} has no _listen_task; hold_realtime_connection needs updating for this realtime version"
+        )
+    while realtime.is_connected:
+        listen_task = realtime._listen_task
+        if listen_task is None:
+            return
+        await asyncio.wait({listen_task})
+        if realtime._listen_task is listen_task:
+            # The socket reader ended without a reconnect taking over
+            return
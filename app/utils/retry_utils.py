@@ -1,9 +1,27 @@
+import random
+import sys
 import time
 from typing import Callable, Any
 from datetime import datetime, timezone
-import json
 import os
 
+import orjson
+
+# Cloud Run sets K_SERVICE; there, log_debug writes one structured JSON line to stdout and no file
+# (the worker logger in worker_logging follows the same settings)
+ON_CLOUD_RUN = bool(os.environ.get("K_SERVICE"))
+LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO" if ON_CLOUD_RUN else "DEBUG").upper()
+# Full data payloads are only serialized when debug output is enabled (default off on Cloud Run)
+DEBUG_PAYLOADS = LOG_LEVEL == "DEBUG"
+
+def _summarize(data: Any) -> Any:
+    """Short stand-in for a payload that is not logged in full."""
+    if isinstance(data, dict):
+        return f"Keys: {list(data.keys())}"
+    if isinstance(data, list):
+        return f"List length: {len(data)}"
+    return str(data)
+
 def log_debug(message: str, data: Any = None, service: str = "general", verbose: bool = True):
     """
     Common logging function for all services.
@@ -12,25 +30,32 @@ def log_debug(message: str, data: Any = None, service: str = "general", verbose:
         message: The message to log
         data: Optional data to log (dict, list, or string)
         service: Service name for log file and context (e.g., "gemini", "docai")
-        verbose: Whether to log detailed data
+        verbose: Whether to log detailed data (only honoured when DEBUG_PAYLOADS is set)
     """
+    full_data = verbose and DEBUG_PAYLOADS
     timestamp = datetime.now(timezone.utc).isoformat()
+    
+    if ON_CLOUD_RUN:
+        # One JSON object per line, which Cloud Logging ingests as a single structured entry
+        entry = {"severity": "DEBUG", "time": timestamp, "service": service, "message": message}
+        if data is not None:
+            entry["data"] = data if full_data else _summarize(data)
+        try:
+            line = orjson.dumps(entry, default=str, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE)
+        except Exception as e:
+            entry["data"] = f"[Could not serialize data: {e}] {str(data)}"
+            line = orjson.dumps(entry, option=orjson.OPT_APPEND_NEWLINE)
+        sys.stdout.write(line.decode())
+        sys.stdout.flush()
+        return
+    
     log_entry = f"\n[{timestamp}] {message}\n"
     
     if data is not None:
-        if verbose:
-            if isinstance(data, (dict, list)):
-                log_entry += json.dumps(data, indent=2)
-            else:
-                log_entry += str(data)
+        if full_data and isinstance(data, (dict, list)):
+            log_entry += orjson.dumps(data, default=str, option=orjson.OPT_NON_STR_KEYS).decode()
         else:
-            # For non-verbose, just log summary
-            if isinstance(data, dict):
-                log_entry += f"Keys: {list(data.keys())}\n"
-            elif isinstance(data, list):
-                log_entry += f"List length: {len(data)}\n"
-            else:
-                log_entry += str(data)
+            log_entry += _summarize(data) if not full_data else str(data)
         log_entry += "\n"
     
     # Ensure logs directory exists
@@ -41,10 +66,9 @@ def log_debug(message: str, data: Any = None, service: str = "general", verbose:
     with open(log_file, "a") as f:
         f.write(log_entry)
     
-    # Also print to stdout for Cloud Run logging
+    # Also print to stdout
     print(log_entry, flush=True)
 
-
 def retry_with_exponential_backoff(
     func: Callable,
     max_retries: int = 3,
@@ -95,8 +119,10 @@ def retry_with_exponential_backoff(
                 raise e
             
             if attempt < max_retries:
-                # Calculate delay with exponential backoff
+                # Calculate delay with exponential backoff; jitter the upper half so concurrent
+                # jobs that failed together (e.g. on a rate limit) don't all retry at the same instant
                 delay = min(base_delay * (2 ** attempt), max_delay)
+                delay = delay / 2 + random.uniform(0, delay / 2)
                 log_debug(
                     f"⚠️ {operation_name} failed (attempt {attempt + 1}), retrying in {delay:.1f}s: {str(e)}",
                     service=service
@@ -0,0 +1,191 @@
+import atexit
+import functools
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+
+import orjson
+
+# Shared with log_debug so both logging paths agree on level and output format.
+# On Cloud Run the filesystem is ephemeral, so log to stdout only there; verbose payloads
+# (full field dumps) are only built and written at DEBUG.
+from app.utils.retry_utils import ON_CLOUD_RUN, LOG_LEVEL
+
+WORKER_LOG_FILE = "worker_v2_debug.log"
+# A batch is written once it holds this many records or has waited this long
+LOG_BATCH_SIZE = 64
+LOG_BATCH_SECONDS = 0.1
+# Local log file rotation, as logging.handlers.RotatingFileHandler would do it
+LOG_MAX_BYTES = 10_000_000
+LOG_BACKUP_COUNT = 3
+
+class PayloadFormatter(logging.Formatter):
+    """
+    Formats worker log records, serializing the optional `data` payload unless snapshot() already did.
+    Runs on the writer thread.
+    """
+
+    def formatTime(self, record, datefmt=None):
+        return datetime.fromtimestamp(record.created, timezone.utc).isoformat()
+
+    def format(self, record):
+        log_entry = f"\n[{self.formatTime(record)}] {record.getMessage()}\n"
+        data = getattr(record, "data", None)
+        if isinstance(data, SerializedData):
+            log_entry += data.decode() + "\n"
+        elif data is not None:
+            try:
+                log_entry += orjson.dumps(data, default=str, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS).decode() + "\n"
+            except Exception as e:
+                log_entry += f"[Could not serialize data: {e}]\n{str(data)}\n"
+        return log_entry
+
+class JsonLineFormatter(logging.Formatter):
+    """
+    One JSON object per line, in the structured format Cloud Logging parses from stdout.
+    """
+
+    def format(self, record):
+        entry = {
+            "severity": record.levelname,
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "message": record.getMessage(),
+        }
+        data = getattr(record, "data", None)
+        if isinstance(data, SerializedData):
+            # Splice the pre-encoded payload in as the last key instead of decoding and re-encoding it
+            return (orjson.dumps(entry)[:-1] + b',"data":' + data + b'}\n').decode()
+        if data is not None:
+            entry["data"] = data
+        try:
+            return orjson.dumps(entry, default=str, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE).decode()
+        except Exception as e:
+            entry["data"] = f"[Could not serialize data: {e}] {str(data)}"
+            return orjson.dumps(entry, option=orjson.OPT_APPEND_NEWLINE).decode()
+
+class SerializedData(bytes):
+    """A payload already encoded as JSON by snapshot(); formatters write it as-is."""
+
+def snapshot(data):
+    """
+    Encode a dict/list payload once, when the record is logged, in the layout the active formatter
+    writes (indented locally, compact for Cloud Run). The writer thread formats records later, by
+    which time the job may have mutated the original.
+    """
+    option = orjson.OPT_NON_STR_KEYS if ON_CLOUD_RUN else orjson.OPT_NON_STR_KEYS | orjson.OPT_INDENT_2
+    try:
+        return SerializedData(orjson.dumps(data, default=str, option=option))
+    except Exception as e:
+        return f"[Could not serialize data: {e}] {str(data)}"
+
+def _write_all(fd, payload):
+    """os.write may write partially; loop until the whole payload is out."""
+    view = memoryview(payload)
+    while view:
+        view = view[os.write(fd, view):]
+
+class RotatingLogFile:
+    """
+    Log file kept open in append mode and rolled over to path.1 .. path.N once it
+    would grow past max_bytes. Only ever written from the writer thread.
+    """
+
+    def __init__(self, path, max_bytes=LOG_MAX_BYTES, backup_count=LOG_BACKUP_COUNT):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self._open()
+
+    def _open(self):
+        self.fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        self.size = os.fstat(self.fd).st_size
+
+    def _rotate(self):
+        os.close(self.fd)
+        for i in range(self.backup_count - 1, 0, -1):
+            if os.path.exists(f"{self.path}.{i}"):
+                os.replace(f"{self.path}.{i}", f"{self.path}.{i + 1}")
+        if self.backup_count > 0:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.truncate(self.path, 0)
+        self._open()
+
+    def write(self, payload):
+        if self.size and self.size + len(payload) > self.max_bytes:
+            self._rotate()
+        _write_all(self.fd, payload)
+        self.size += len(payload)
+
+class BatchLogWriter(threading.Thread):
+    """
+    Drains the log queue and writes records in batches with a single write per
+    sink (stdout, plus the rotating log file when running locally).
+    """
+
+    def __init__(self, log_queue, formatter, sinks):
+        super().__init__(name="worker-log-writer", daemon=True)
+        self.log_queue = log_queue
+        self.formatter = formatter
+        self.sinks = sinks
+
+    def run(self):
+        stopping = False
+        while not stopping:
+            batch = [self.log_queue.get()]
+            deadline = time.monotonic() + LOG_BATCH_SECONDS
+            while len(batch) < LOG_BATCH_SIZE:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self.log_queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            if None in batch:
+                stopping = True
+            self._flush([record for record in batch if record is not None])
+
+    def _flush(self, records):
+        if not records:
+            return
+        payload = "".join(self.formatter.format(record) for record in records).encode("utf-8", "replace")
+        for sink in self.sinks:
+            try:
+                sink(payload)
+            except OSError:
+                pass
+
+    def stop(self):
+        self.log_queue.put(None)
+        self.join()
+
+def _build_worker_logger():
+    """Configure the worker logger: callers enqueue records, a writer thread formats and writes them in batches."""
+    logger = logging.getLogger("worker_v2")
+    logger.setLevel(LOG_LEVEL)
+    logger.propagate = False
+
+    stdout = functools.partial(_write_all, sys.stdout.fileno())
+    if ON_CLOUD_RUN:
+        # Structured stdout only; Cloud Run's logging agent ingests it natively
+        formatter = JsonLineFormatter()
+        sinks = [stdout]
+    else:
+        formatter = PayloadFormatter()
+        sinks = [RotatingLogFile(WORKER_LOG_FILE).write, stdout]
+
+    log_queue = queue.Queue(-1)
+    logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    writer = BatchLogWriter(log_queue, formatter, sinks)
+    writer.start()
+    # Drain pending records on interpreter shutdown
+    atexit.register(writer.stop)
+    return logger
+
+worker_logger = _build_worker_logger()
@@ -1,33 +1,48 @@
+import io
 import os
 import time
 import tempfile
 import traceback
-import json
+import logging
+import asyncio
+import queue
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
-from typing import Dict, Any
+from contextlib import ExitStack, suppress
+from typing import BinaryIO, Dict, Any, Optional
+from urllib.parse import quote
 import re
 
-from fastapi import FastAPI, HTTPException, Request
+
+from fastapi import BackgroundTasks, FastAPI, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
+import orjson
 import uvicorn
+from supabase import acreate_client
 
 # Import new services
-from app.services.docai_service import process_image_with_docai
-from app.services.settings_service import get_field_requirements, apply_field_requirements, sync_field_requirements, sync_field_types_and_options
-from app.services.review_service import determine_review_status, validate_field_data
+from app.services.docai_service import process_image_with_docai, MIME_TYPES
+from app.services.settings_service import get_school_config, invalidate_school_config, card_fields_to_requirements, school_config_cache, apply_field_requirements, field_requirements_in_sync, sync_field_requirements, sync_field_types_and_options
+from app.services.review_service import validate_and_review
 from app.services.address_service import validate_and_enhance_address
-from app.services.gemini_service import process_card_with_gemini_v2
+from app.services.document_service import validate_zip_code
+from app.services.gemini_service import process_card_with_gemini_v2, INLINE_IMAGE_MAX_BYTES
 
 # Import existing infrastructure
-from app.repositories.processing_jobs_repository import update_processing_job
-from app.core.clients import supabase_client
+from app.repositories.processing_jobs_repository import update_processing_job, claim_next_processing_job, try_claim_processing_job
+from app.core.clients import supabase_client, http_client
 from app.repositories.reviewed_data_repository import upsert_reviewed_data
-from app.config import DOCAI_PROCESSOR_ID
+from app.config import DOCAI_PROCESSOR_ID, SUPABASE_URL, SUPABASE_KEY
 
 # Import utils
-from app.utils.image_processing import ensure_trimmed_image
-from app.utils.storage import upload_to_supabase_storage_from_path
+from app.utils.storage import upload_to_supabase_storage_from_bytes, upload_to_supabase_storage_from_path
 from app.utils.field_utils import filter_combined_fields
+from app.utils.worker_logging import worker_logger, snapshot
+from app.utils.realtime_utils import hold_realtime_connection, UnsupportedRealtimeClient
 
 from app.repositories.uploads_repository import (
     update_job_status_with_review
@@ -35,9 +50,37 @@ from app.repositories.uploads_repository import (
 
 BUCKET = "cards-uploads"
 MAX_RETRIES = 3
-SLEEP_SECONDS = 1
+# Downloads are streamed to disk in chunks of this size
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+# Identifies this worker instance on the jobs it claims
+WORKER_ID = str(uuid.uuid4())
+# Fallback poll interval in case a Realtime notification is missed
+JOB_HEARTBEAT_SECONDS = 30
+# Opt-in: also run main_v2's queue loop (Realtime wakeups + heartbeat poll) next to /process dispatch
+WORKER_QUEUE_LOOP = os.environ.get("WORKER_QUEUE_LOOP", "0") == "1"
+# AI retries keep the stored DocAI values when every enabled field is at least this confident
+DOCAI_FASTPATH_CONFIDENCE = 0.9
+
+# Jobs are network-bound (Supabase, DocAI, Gemini), so run several at once per container
+WORKER_CONCURRENCY = int(os.environ.get("WORKER_CONCURRENCY", 8))
+job_executor = ThreadPoolExecutor(max_workers=WORKER_CONCURRENCY, thread_name_prefix="job")
+# User-facing AI retries get their own threads, so they never queue behind pipeline jobs
+RETRY_CONCURRENCY = int(os.environ.get("RETRY_CONCURRENCY", 2))
+retry_executor = ThreadPoolExecutor(max_workers=RETRY_CONCURRENCY, thread_name_prefix="retry")
+# Overlaps independent I/O (Supabase lookups, image upload) inside a single job
+_io_pool = ThreadPoolExecutor(max_workers=WORKER_CONCURRENCY * 2, thread_name_prefix="job-io")
+# Free pool slots for jobs claimed by main_v2
+_job_slots = threading.Semaphore(WORKER_CONCURRENCY)
+
+# Wakeups pushed by the Realtime listener thread and finished jobs, consumed by main_v2
+_job_wakeups: "queue.Queue[Any]" = queue.Queue()
 
-app = FastAPI(title="CardCapture Worker API")
+# Skip building verbose-only log payloads entirely when DEBUG records would be dropped
+DEBUG_LOGGING = worker_logger.isEnabledFor(logging.DEBUG)
+
+app = FastAPI(title="CardCapture Worker API", default_response_class=ORJSONResponse)
+# Expose the per-school config cache so it can be inspected or cleared at the app level
+app.state.school_config_cache = school_config_cache
 
 # Add CORS middleware
 app.add_middleware(
@@ -52,24 +95,35 @@ app.add_middleware(
 def root():
     return {"message": "CardCapture Worker API is running"}
 
+def _warm_supabase_pool() -> None:
+    """One cheap query so the PostgREST connection is open before the first job."""
+    try:
+        supabase_client.table("processing_jobs").select("id").limit(1).execute()
+    except Exception as e:
+        log_worker_debug(f"Supabase connection warm-up failed: {str(e)}")
+
+@app.on_event("startup")
+def warm_connections():
+    # In the background, so startup (and Cloud Run's readiness check) does not wait on it
+    _io_pool.submit(_warm_supabase_pool)
+
+@app.on_event("startup")
+def start_queue_worker():
+    # Pull queued jobs alongside the /process pushes, so a missed dispatch is still picked up
+    if WORKER_QUEUE_LOOP:
+        threading.Thread(target=main_v2, name="queue-worker", daemon=True).start()
+
 def log_worker_debug(message: str, data: Any = None, verbose: bool = False):
-    """Write debug message and optional data to worker_v2_debug.log and stdout for Cloud Run."""
-    timestamp = datetime.now(timezone.utc).isoformat()
-    log_entry = f"\n[{timestamp}] {message}\n"
-    if data is not None:
-        try:
-            import json
-            log_entry += json.dumps(data, indent=2, default=str) + "\n"
-        except Exception as e:
-            log_entry += f"[Could not serialize data: {e}]\n{str(data)}\n"
-    # Write to file
-    with open('worker_v2_debug.log', 'a') as f:
-        f.write(log_entry)
-    # Also print to stdout for Cloud Run logging
-    print(log_entry, flush=True)
-
-def download_from_supabase(file_url: str, local_path: str) -> None:
-    """Download file from Supabase storage to local path"""
+    """Queue debug message and optional data for worker_v2_debug.log and stdout (formatted off-thread)."""
+    level = logging.DEBUG if verbose else logging.INFO
+    if worker_logger.isEnabledFor(level):
+        if isinstance(data, (dict, list)):
+            # Callers pass live field dicts that later steps mutate; encode them once, now
+            data = snapshot(data)
+        worker_logger.log(level, message, extra={"data": data})
+
+def download_from_supabase(file_url: str, dest: BinaryIO) -> None:
+    """Download file from Supabase storage into an open binary file"""
     try:
         # Extract bucket and file path from URL
         # Format: "bucket-name/path/to/file.ext"
@@ -82,22 +136,69 @@ def download_from_supabase(file_url: str, local_path: str) -> None:
         
         log_worker_debug(f"Downloading from bucket: {bucket_name}, path: {file_path}")
         
-        # Download file
-        response = supabase_client.storage.from_(bucket_name).download(file_path)
-        
-        with open(local_path, 'wb') as f:
-            f.write(response)
+        # Stream the object to disk in chunks instead of buffering the whole file in memory
+        url = f"{SUPABASE_URL}/storage/v1/object/authenticated/{bucket_name}/{quote(file_path)}"
+        headers = {"Authorization": f"Bearer {SUPABASE_KEY}", "apikey": SUPABASE_KEY}
+        with http_client.stream("GET", url, headers=headers, timeout=60.0) as response:
+            response.raise_for_status()
+            for chunk in response.iter_bytes(DOWNLOAD_CHUNK_SIZE):
+                dest.write(chunk)
             
-        log_worker_debug(f"Downloaded file from {file_url} to {local_path}")
+        log_worker_debug(f"Downloaded file from {file_url} to {getattr(dest, 'name', 'memory')}")
         
     except Exception as e:
         log_worker_debug(f"ERROR downloading file: {str(e)}")
         raise
 
-def split_combined_address_fields(fields: dict, school_id: str = None) -> dict:
+def download_bytes_from_supabase(file_url: str) -> bytes:
+    """Download file from Supabase storage into memory, for small objects like the trimmed image"""
+    buffer = io.BytesIO()
+    download_from_supabase(file_url, buffer)
+    return buffer.getvalue()
+
+# Combined address formats fused into one alternation, tried in priority order:
+#   City, State, Zip / City, State Zip | City, State | City State Zip | City State
+# All allow optional trailing punctuation. Group names are "<format>_<field key>".
+_ADDR_COMBINED = re.compile(
+    r'(?:'
+    r'(?P<csz_city>[^,]+),\s*(?P<csz_state>[A-Z]{2})(?:,\s*|\s+)(?P<csz_zip_code>\d{5}(?:-\d{4})?)'
+    r'|(?P<cs_city>[^,]+),\s*(?P<cs_state>[A-Z]{2})'
+    r'|(?P<ssz_city>[^,]+)\s+(?P<ssz_state>[A-Z]{2})\s+(?P<ssz_zip_code>\d{5}(?:-\d{4})?)'
+    r'|(?P<ss_city>[^,]+)\s+(?P<ss_state>[A-Z]{2})'
+    r')[.,;:]*?'
+)
+# Last group of each alternative -> (format prefix, fields it yields, log label)
+_ADDR_FORMATS = {
+    'csz_zip_code': ('csz', ('city', 'state', 'zip_code'), 'city/state/zip'),
+    'cs_state': ('cs', ('city', 'state'), 'city/state'),
+    'ssz_zip_code': ('ssz', ('city', 'state', 'zip_code'), 'city/state/zip'),
+    'ss_state': ('ss', ('city', 'state'), 'city/state'),
+}
+# Keys DocAI may return a combined city/state/zip value under, in the order they are applied
+_COMBINED_ADDRESS_KEYS = ('city_state_zip', 'citystatezip', 'city_state', 'address_line')
+# Fields a combined value is split into
+_SPLIT_ADDRESS_KEYS = ('city', 'state', 'zip_code')
+_STATE_CODE = re.compile(r'[A-Z]{2}')
+_ZIP = re.compile(r'\d{5}(?:-\d{4})?')
+
+def _has_value(field: Any) -> bool:
+    """True for a field entry with a non-empty value."""
+    return isinstance(field, dict) and bool(field.get('value'))
+
+def _split_field(value: str, confidence: float, source: str) -> dict:
+    """Field entry for a value split out of a combined address field."""
+    return {
+        'value': value,
+        'confidence': confidence,
+        'source': source,
+        'enabled': True,
+        'required': False
+    }
+
+def split_combined_address_fields(fields: dict) -> dict:
     """
     Detects and splits combined address/city/state/zip fields into separate fields.
-    Enhanced version that tracks split fields for school settings synchronization.
+    The split fields are synced with school settings along with the rest in Step 5.
     Handles multiple formats:
     - "City, State, Zip"
     - "City, State Zip"
@@ -105,239 +206,205 @@ def split_combined_address_fields(fields: dict, school_id: str = None) -> dict:
     - "City, State"
     - "City State"
     """
+    # Only combined fields that carry a value can be split
+    present = [key for key in _COMBINED_ADDRESS_KEYS if _has_value(fields.get(key))]
+    if not present:
+        return fields
+    # DocAI already extracted city, state and zip separately; nothing to fill in
+    if all(_has_value(fields.get(key)) for key in _SPLIT_ADDRESS_KEYS):
+        return fields
+    
     split_fields = set()  # Track which fields were split
     
-    for key in ['city_state_zip', 'citystatezip', 'city_state', 'address_line']:
-        field = fields.get(key)
-        if field and isinstance(field, dict) and field.get('value'):
-            value = field['value'].replace('\n', ' ').replace('\r', ' ').strip()
-            
-            # Pattern 1: City, State, Zip (with optional trailing punctuation)
-            match = re.match(r'^([^,]+),\s*([A-Z]{2})(?:,\s*|\s+)(\d{5}(?:-\d{4})?)[.,;:]*?$', value)
-            if match:
-                fields['city'] = {
-                    'value': match.group(1).strip(),
-                    'confidence': field.get('confidence', 0.8),
-                    'source': 'address_splitting',
-                    'enabled': True,
-                    'required': False
-                }
-                fields['state'] = {
-                    'value': match.group(2).strip(),
-                    'confidence': field.get('confidence', 0.8),
-                    'source': 'address_splitting',
-                    'enabled': True,
-                    'required': False
-                }
-                fields['zip_code'] = {
-                    'value': match.group(3).strip(),
-                    'confidence': field.get('confidence', 0.8),
-                    'source': 'address_splitting',
-                    'enabled': True,
-                    'required': False
-                }
-                split_fields.update(['city', 'state', 'zip_code'])
-                log_worker_debug(f"Split {key} into city/state/zip: {match.group(1).strip()}, {match.group(2).strip()}, {match.group(3).strip()}")
-                continue
-
-            # Pattern 2: City, State (no zip, with optional trailing punctuation)
-            match = re.match(r'^([^,]+),\s*([A-Z]{2})[.,;:]*?$', value)
-            if match:
-                fields['city'] = {
-                    'value': match.group(1).strip(),
-                    'confidence': field.get('confidence', 0.8),
-                    'source': 'address_splitting',
-                    'enabled': True,
-                    'required': False
-                }
-                fields['state'] = {
-                    'value': match.group(2).strip(),
-                    'confidence': field.get('confidence', 0.8),
-                    'source': 'address_splitting',
-                    'enabled': True,
-                    'required': False
-                }
-                split_fields.update(['city', 'state'])
-                log_worker_debug(f"Split {key} into city/state: {match.group(1).strip()}, {match.group(2).strip()}")
-                continue
-
-            # Pattern 3: City State Zip (no commas, with optional trailing punctuation)
-            match = re.match(r'^([^,]+)\s+([A-Z]{2})\s+(\d{5}(?:-\d{4})?)[.,;:]*?$', value)
-            if match:
-                fields['city'] = {
-                    'value': match.group(1).strip(),
-                    'confidence': field.get('confidence', 0.8),
-                    'source': 'address_splitting',
-                    'enabled': True,
-                    'required': False
-                }
-                fields['state'] = {
-                    'value': match.group(2).strip(),
-                    'confidence': field.get('confidence', 0.8),
-                    'source': 'address_splitting',
-                    'enabled': True,
-                    'required': False
-                }
-                fields['zip_code'] = {
-                    'value': match.group(3).strip(),
-                    'confidence': field.get('confidence', 0.8),
-                    'source': 'address_splitting',
-                    'enabled': True,
-                    'required': False
-                }
-                split_fields.update(['city', 'state', 'zip_code'])
-                log_worker_debug(f"Split {key} into city/state/zip: {match.group(1).strip()}, {match.group(2).strip()}, {match.group(3).strip()}")
-                continue
-
-            # Pattern 4: City State (no commas, no zip, with optional trailing punctuation)
-            match = re.match(r'^([^,]+)\s+([A-Z]{2})[.,;:]*?$', value)
-            if match:
-                fields['city'] = {
-                    'value': match.group(1).strip(),
-                    'confidence': field.get('confidence', 0.8),
-                    'source': 'address_splitting',
-                    'enabled': True,
-                    'required': False
-                }
-                fields['state'] = {
-                    'value': match.group(2).strip(),
-                    'confidence': field.get('confidence', 0.8),
-                    'source': 'address_splitting',
-                    'enabled': True,
-                    'required': False
-                }
-                split_fields.update(['city', 'state'])
-                log_worker_debug(f"Split {key} into city/state: {match.group(1).strip()}, {match.group(2).strip()}")
-                continue
-
+    for key in present:
+        field = fields[key]
+        # Normalize line breaks, tabs and runs of spaces to single spaces in one split/join
+        value = ' '.join(field['value'].split())
+        # Every format (and the fallback) needs an uppercase state code; skip the regex work without one
+        if value.lower() == value:
+            continue
+        
+        # One pass over all known formats; lastgroup tells which one matched
+        match = _ADDR_COMBINED.fullmatch(value)
+        if match:
+            prefix, keys, label = _ADDR_FORMATS[match.lastgroup]
+            parts = [match.group(f"{prefix}_{field_key}").strip() for field_key in keys]
+            for field_key, part in zip(keys, parts):
+                fields[field_key] = _split_field(part, field.get('confidence', 0.8), 'address_splitting')
+            split_fields.update(keys)
+            log_worker_debug(f"Split {key} into {label}: {', '.join(parts)}")
+        else:
             # If no patterns match, try to extract just city and state
             # This is a fallback for less structured formats
             parts = value.split()
-            if len(parts) >= 2:
-                # Look for a two-letter state code
-                for i in range(len(parts) - 1):
-                    # Remove punctuation from the potential state part for matching
-                    state_part = parts[i + 1].rstrip('.,;:')
-                    if re.match(r'^[A-Z]{2}$', state_part):
-                        city = ' '.join(parts[:i + 1])
-                        state = state_part
-                        fields['city'] = {
-                            'value': city.strip(),
-                            'confidence': field.get('confidence', 0.6),
-                            'source': 'address_splitting_fallback',
-                            'enabled': True,
-                            'required': False
-                        }
-                        fields['state'] = {
-                            'value': state.strip(),
-                            'confidence': field.get('confidence', 0.6),
-                            'source': 'address_splitting_fallback',
-                            'enabled': True,
-                            'required': False
-                        }
-                        split_fields.update(['city', 'state'])
-                        
-                        # If there's a zip code after the state
-                        if i + 2 < len(parts):
-                            zip_part = parts[i + 2].rstrip('.,;:')
-                            if re.match(r'^\d{5}(?:-\d{4})?$', zip_part):
-                                fields['zip_code'] = {
-                                    'value': zip_part.strip(),
-                                'confidence': field.get('confidence', 0.6),
-                                'source': 'address_splitting_fallback',
-                                'enabled': True,
-                                'required': False
-                            }
-                            split_fields.add('zip_code')
-                        
-                        log_worker_debug(f"Split {key} using fallback into: {list(split_fields)}")
-                        break
-
-    # If we split any fields and have a school_id, sync with school settings immediately
-    if split_fields and school_id:
-        log_worker_debug(f"Split address fields detected: {list(split_fields)}, syncing with school settings")
-        current_fields = list(fields.keys())
-        try:
-            sync_field_requirements(school_id, current_fields)
-            log_worker_debug("Successfully synced split address fields with school settings")
-        except Exception as e:
-            log_worker_debug(f"Warning: Failed to sync split fields with school settings: {str(e)}")
+            # Look for a two-letter state code after at least one city word.
+            # Tokens are already whitespace-free; only trailing punctuation needs removing.
+            for i, part in enumerate(parts[1:], 1):
+                state_part = part.rstrip('.,;:')
+                if not _STATE_CODE.fullmatch(state_part):
+                    continue
+                confidence = field.get('confidence', 0.6)
+                fields['city'] = _split_field(' '.join(parts[:i]), confidence, 'address_splitting_fallback')
+                fields['state'] = _split_field(state_part, confidence, 'address_splitting_fallback')
+                split_keys = ['city', 'state']
+                
+                # If there's a zip code right after the state
+                zip_part = parts[i + 1].rstrip('.,;:') if i + 1 < len(parts) else ''
+                if _ZIP.fullmatch(zip_part):
+                    fields['zip_code'] = _split_field(zip_part, confidence, 'address_splitting_fallback')
+                    split_keys.append('zip_code')
+                
+                split_fields.update(split_keys)
+                log_worker_debug(f"Split {key} using fallback into: {split_keys}")
+                break
 
     return fields
 
+# Static quality indicators added to every DocAI field when Gemini fails
+_PREPARED_EXTRA = {
+    "edit_made": False,
+    "edit_type": "none",
+    "text_clarity": "unclear",
+    "certainty": "uncertain",
+    "notes": "AI processing failed - showing raw OCR data",
+    "requires_human_review": False,
+    "review_notes": ""
+}
+
 def prepare_docai_for_review(docai_fields: Dict[str, Any]) -> Dict[str, Any]:
     """
     Prepare DocAI fields for review system when Gemini fails.
     Add required quality indicators so review system doesn't break.
     """
-    prepared_fields = {}
-    
-    for field_name, field_data in docai_fields.items():
-        prepared_fields[field_name] = field_data.copy()
-        # Add minimal required indicators for review system compatibility
-        prepared_fields[field_name].update({
-            "edit_made": False,
-            "edit_type": "none",
+    # Copy each field and add minimal required indicators for review system compatibility
+    return {
+        field_name: {
+            **field_data,
+            **_PREPARED_EXTRA,
             "original_value": field_data.get("value", ""),
-            "text_clarity": "unclear",
-            "certainty": "uncertain", 
-            "notes": "AI processing failed - showing raw OCR data",
-            "review_confidence": field_data.get("confidence", 0.0),
-            "requires_human_review": False,
-            "review_notes": ""
-        })
-    
-    return prepared_fields
+            "review_confidence": field_data.get("confidence", 0.0)
+        }
+        for field_name, field_data in docai_fields.items()
+    }
+
+def _docai_fields_confident(fields: Dict[str, Any]) -> bool:
+    """True if every enabled field has a value DocAI read with at least DOCAI_FASTPATH_CONFIDENCE."""
+    enabled = [field_data for field_data in fields.values() if isinstance(field_data, dict) and field_data.get("enabled", True)]
+    return bool(enabled) and all(
+        _has_value(field_data) and field_data.get("confidence", 0.0) >= DOCAI_FASTPATH_CONFIDENCE
+        for field_data in enabled
+    )
 
-def detect_field_value_discrepancies(before_fields: dict, after_fields: dict, step_name: str) -> None:
+def _field_summary(fields: dict, with_settings: bool = False) -> dict:
+    """Per-field value and confidence (plus enabled/required) for debug telemetry."""
+    summary = {}
+    for field_name, field_data in fields.items():
+        if isinstance(field_data, dict):
+            entry = {"value": field_data.get("value", ""), "confidence": field_data.get("confidence", 0.0)}
+            if with_settings:
+                entry["enabled"] = field_data.get("enabled", True)
+                entry["required"] = field_data.get("required", False)
+            summary[field_name] = entry
+    return summary
+
+def _field_values(fields: dict) -> dict:
+    """Flat {field_name: value} snapshot for discrepancy checks (non-dict entries count as empty)."""
+    return {
+        field_name: field_data.get("value", "") if isinstance(field_data, dict) else ""
+        for field_name, field_data in fields.items()
+    }
+
+def detect_field_value_discrepancies(before_values: dict, after_values: dict, step_name: str) -> None:
     """
     Helper function to detect and log field value discrepancies between processing steps
     
     Args:
-        before_fields: Field data before processing step
-        after_fields: Field data after processing step
+        before_values: _field_values snapshot taken before the processing step
+        after_values: _field_values snapshot taken after the processing step
         step_name: Name of the processing step for logging
     """
     discrepancies = []
     
     # Check for value changes in existing fields
-    for field_name in before_fields.keys():
-        if field_name in after_fields:
-            before_value = before_fields[field_name].get("value", "") if isinstance(before_fields[field_name], dict) else ""
-            after_value = after_fields[field_name].get("value", "") if isinstance(after_fields[field_name], dict) else ""
-            
-            # Check if a non-empty value became empty
-            if before_value and not after_value:
-                discrepancies.append({
-                    "field": field_name,
-                    "issue": "value_lost",
-                    "before": before_value,
-                    "after": after_value
-                })
-            # Check if value changed unexpectedly
-            elif before_value != after_value and before_value and after_value:
-                discrepancies.append({
-                    "field": field_name,
-                    "issue": "value_changed",
-                    "before": before_value,
-                    "after": after_value
-                })
-        else:
+    for field_name, before_value in before_values.items():
+        if not before_value:
+            continue
+        if field_name not in after_values:
             # Field disappeared entirely
-            before_value = before_fields[field_name].get("value", "") if isinstance(before_fields[field_name], dict) else ""
-            if before_value:
-                discrepancies.append({
-                    "field": field_name,
-                    "issue": "field_removed",
-                    "before": before_value,
-                    "after": "FIELD_MISSING"
-                })
+            discrepancies.append({
+                "field": field_name,
+                "issue": "field_removed",
+                "before": before_value,
+                "after": "FIELD_MISSING"
+            })
+            continue
+        after_value = after_values[field_name]
+        # Check if a non-empty value became empty
+        if not after_value:
+            discrepancies.append({
+                "field": field_name,
+                "issue": "value_lost",
+                "before": before_value,
+                "after": after_value
+            })
+        # Check if value changed unexpectedly
+        elif before_value != after_value:
+            discrepancies.append({
+                "field": field_name,
+                "issue": "value_changed",
+                "before": before_value,
+                "after": after_value
+            })
     
     if discrepancies:
         log_worker_debug(f"⚠️  FIELD VALUE DISCREPANCIES DETECTED in {step_name}", discrepancies)
     else:
         log_worker_debug(f"✅ No field value discrepancies detected in {step_name}")
 
+def _school_config_for_job(job: Dict[str, Any]):
+    """(processor_id, field_requirements, majors) from the school columns joined into a claimed job, else the cached lookup."""
+    if "docai_processor_id" in job and "card_fields" in job and "majors" in job:
+        return (
+            job["docai_processor_id"] or DOCAI_PROCESSOR_ID,
+            card_fields_to_requirements(job["card_fields"] or []),
+            job["majors"] or []
+        )
+    return get_school_config(job["school_id"])
+
+def _sync_field_types(school_id: str, detected_field_info: Dict[str, Dict[str, Any]]) -> None:
+    """Step 8.1: sync Gemini-detected field types/options into school settings. Never fails the job."""
+    try:
+        sync_field_types_and_options(school_id, detected_field_info)
+        log_worker_debug("Field types and options synced successfully")
+    except Exception as sync_error:
+        log_worker_debug(f"Warning: Failed to sync field types: {str(sync_error)}")
+
+def _upload_suffix(file_url: str) -> str:
+    """Temp-file suffix for an upload: its extension if DocAI knows it, else '.png' (DocAI's default MIME type)."""
+    ext = "." + file_url.rsplit(".", 1)[-1].lower() if "." in file_url[-6:] else ".png"
+    return ext if ext in MIME_TYPES else ".png"
+
+def _remove_file(path: str) -> None:
+    """Remove a job's scratch file; already gone is fine."""
+    with suppress(FileNotFoundError):
+        os.remove(path)
+
+def _upload_trimmed_image(trimmed_jpeg: Optional[bytes], image_path: str, user_id: str):
+    """
+    Upload the in-memory trimmed card JPEG (or the original image if trimming failed) to Supabase storage.
+    Returns the storage path, or None if the upload fails.
+    """
+    try:
+        if trimmed_jpeg is not None:
+            trimmed_storage_path = upload_to_supabase_storage_from_bytes(supabase_client, trimmed_jpeg, user_id, "trimmed.jpg", "image/jpeg")
+        else:
+            trimmed_storage_path = upload_to_supabase_storage_from_path(supabase_client, image_path, user_id, os.path.basename(image_path))
+        log_worker_debug(f"Trimmed image uploaded to Supabase: {trimmed_storage_path}")
+        return trimmed_storage_path
+    except Exception as e:
+        log_worker_debug(f"Failed to upload trimmed image to Supabase: {e}")
+        return None
+
 def process_job_v2(job: Dict[str, Any]) -> None:
     """
     Simplified, reliable processing flow with atomic database operations
@@ -357,137 +424,118 @@ def process_job_v2(job: Dict[str, Any]) -> None:
         "File URL": file_url
     })
     
-    tmp_file = None
+    job_started = time.perf_counter()
+    # Cleanup for everything the job writes to disk; runs on success and failure alike
+    cleanup = ExitStack()
     try:
-        # Step 1: Get school field requirements
+        # Step 1: Get school field requirements (fetched in the background while the image downloads)
         log_worker_debug("=== STEP 1: GET FIELD REQUIREMENTS ===")
-        school_query = supabase_client.table("schools").select("docai_processor_id").eq("id", school_id).maybe_single().execute()
-        processor_id = school_query.data.get("docai_processor_id") if school_query and school_query.data else DOCAI_PROCESSOR_ID
-        log_worker_debug(f"Using DocAI processor: {processor_id}")
-        
-        field_requirements = get_field_requirements(school_id)
-        log_worker_debug("Current Field Requirements", field_requirements, verbose=True)
+        school_config_future = _io_pool.submit(_school_config_for_job, job)
         
         # Step 2: Download image
         log_worker_debug("=== STEP 2: DOWNLOAD IMAGE ===")
-        with tempfile.NamedTemporaryFile(delete=False, suffix=os.path.splitext(file_url)[1] or '.png') as tmp:
-            tmp_file = tmp.name
-        download_from_supabase(file_url, tmp_file)
+        # Write through the fd mkstemp already opened instead of closing and reopening the path
+        fd, tmp_file = tempfile.mkstemp(suffix=_upload_suffix(file_url))
+        cleanup.callback(_remove_file, tmp_file)
+        with os.fdopen(fd, 'wb') as tmp:
+            download_from_supabase(file_url, tmp)
+        
+        processor_id, field_requirements, valid_majors = school_config_future.result()
+        log_worker_debug(f"Using DocAI processor: {processor_id}")
+        log_worker_debug("Current Field Requirements", field_requirements, verbose=True)
         
         # Step 3: Process with DocAI
         log_worker_debug("=== STEP 3: DOCAI PROCESSING ===")
-        docai_fields, cropped_image_path = process_image_with_docai(tmp_file, processor_id)
+        docai_fields, cropped_image_path, trimmed_jpeg = process_image_with_docai(tmp_file, processor_id)
+        if cropped_image_path != tmp_file:
+            cleanup.callback(_remove_file, cropped_image_path)
+        # Start Step 11 (upload trimmed image) now so it overlaps the remaining steps
+        trimmed_upload_future = _io_pool.submit(_upload_trimmed_image, trimmed_jpeg, tmp_file, user_id)
+        # The upload may still be reading tmp_file if a later step fails; let it finish before cleanup
+        cleanup.callback(trimmed_upload_future.result)
         log_worker_debug("Original DocAI Response", docai_fields, verbose=True)
-        log_worker_debug("DocAI field names extracted", list(docai_fields.keys()))
-        
-        # Track field values from DocAI
-        docai_field_values = {}
-        for field_name, field_data in docai_fields.items():
-            if isinstance(field_data, dict):
-                docai_field_values[field_name] = {
-                    "value": field_data.get("value", ""),
-                    "confidence": field_data.get("confidence", 0.0)
-                }
-        log_worker_debug("DocAI field values summary", docai_field_values)
+        log_worker_debug(f"DocAI extracted {len(docai_fields)} fields")
+        
+        if DEBUG_LOGGING:
+            log_worker_debug("DocAI field values summary", _field_summary(docai_fields), verbose=True)
         
         # Step 4: Split address fields
         log_worker_debug("=== STEP 4: SPLIT ADDRESS FIELDS ===")
-        pre_split_fields = docai_fields.copy()
-        docai_fields = split_combined_address_fields(docai_fields, school_id)
-        detect_field_value_discrepancies(pre_split_fields, docai_fields, "Address Splitting")
+        pre_split_values = _field_values(docai_fields) if DEBUG_LOGGING else None
+        docai_fields = split_combined_address_fields(docai_fields)
+        if DEBUG_LOGGING:
+            detect_field_value_discrepancies(pre_split_values, _field_values(docai_fields), "Address Splitting")
         log_worker_debug("Fields After Address Splitting", docai_fields, verbose=True)
-        log_worker_debug("Field names after address splitting", list(docai_fields.keys()))
-        
-        # Track field values after address splitting
-        split_field_values = {}
-        for field_name, field_data in docai_fields.items():
-            if isinstance(field_data, dict):
-                split_field_values[field_name] = {
-                    "value": field_data.get("value", ""),
-                    "confidence": field_data.get("confidence", 0.0)
-                }
-        log_worker_debug("Field values after address splitting", split_field_values)
+        log_worker_debug(f"{len(docai_fields)} fields after address splitting")
+        
+        if DEBUG_LOGGING:
+            log_worker_debug("Field values after address splitting", _field_summary(docai_fields), verbose=True)
         
         # Step 5: Sync fields with school settings
         log_worker_debug("=== STEP 5: SYNC WITH SCHOOL SETTINGS ===")
-        field_requirements = sync_field_requirements(school_id, list(docai_fields.keys()))
+        # One sync covers DocAI and split address fields; skipped when settings already list them all
+        if field_requirements_in_sync(field_requirements, valid_majors, docai_fields):
+            log_worker_debug("School settings already cover all detected fields, skipping sync")
+        else:
+            field_requirements = sync_field_requirements(school_id, list(docai_fields.keys()))
         log_worker_debug("Field Requirements", field_requirements, verbose=True)
         
         # Step 6: Apply requirements to fields
         log_worker_debug("=== STEP 6: APPLY FIELD REQUIREMENTS ===")
-        pre_requirements_fields = docai_fields.copy()
+        pre_requirements_values = _field_values(docai_fields) if DEBUG_LOGGING else None
         docai_fields = apply_field_requirements(docai_fields, field_requirements)
-        detect_field_value_discrepancies(pre_requirements_fields, docai_fields, "Field Requirements Application")
+        if DEBUG_LOGGING:
+            detect_field_value_discrepancies(pre_requirements_values, _field_values(docai_fields), "Field Requirements Application")
         log_worker_debug("Fields After Requirements", docai_fields, verbose=True)
         
-        # Track field values after requirements application
-        requirements_field_values = {}
-        for field_name, field_data in docai_fields.items():
-            if isinstance(field_data, dict):
-                requirements_field_values[field_name] = {
-                    "value": field_data.get("value", ""),
-                    "confidence": field_data.get("confidence", 0.0),
-                    "enabled": field_data.get("enabled", True),
-                    "required": field_data.get("required", False)
-                }
-        log_worker_debug("Field values after requirements applied", requirements_field_values)
+        if DEBUG_LOGGING:
+            # Also exactly what is sent to Gemini in Step 8
+            log_worker_debug("Field values after requirements applied", _field_summary(docai_fields, with_settings=True), verbose=True)
         
-        # Step 7: Fetch valid majors
-        log_worker_debug("=== STEP 7: FETCH VALID MAJORS ===")
-        majors_query = supabase_client.table("schools").select("majors").eq("id", school_id).maybe_single().execute()
-        valid_majors = majors_query.data.get("majors") if majors_query and majors_query.data and majors_query.data.get("majors") else []
+        # Step 7: Valid majors (loaded with the school config in Step 1)
+        log_worker_debug("=== STEP 7: VALID MAJORS ===")
         log_worker_debug("Valid majors", valid_majors, verbose=True)
         
         # Step 8: Process with Gemini (with failure handling)
         log_worker_debug("=== STEP 8: GEMINI PROCESSING ===")
         ai_processing_failed = False
         ai_error_message = None
+        field_types_future = None
         
-        log_worker_debug("Fields being sent to Gemini", list(docai_fields.keys()))
-        
-        # Track field values being sent to Gemini
-        gemini_input_values = {}
-        for field_name, field_data in docai_fields.items():
-            if isinstance(field_data, dict):
-                gemini_input_values[field_name] = {
-                    "value": field_data.get("value", ""),
-                    "confidence": field_data.get("confidence", 0.0),
-                    "enabled": field_data.get("enabled", True),
-                    "required": field_data.get("required", False)
-                }
-        log_worker_debug("Field values sent to Gemini", gemini_input_values)
+        log_worker_debug(f"Sending {len(docai_fields)} fields to Gemini")
+        
+        # The zip code lookup for Step 9 only needs the DocAI value, so run it while Gemini works.
+        # It is reused in Step 9 unless Gemini changed the zip code.
+        docai_zip = (docai_fields.get("zip_code") or {}).get("value") or ""
+        zip_future = _io_pool.submit(validate_zip_code, docai_zip) if docai_zip else None
         
         try:
-            pre_gemini_fields = docai_fields.copy()
+            pre_gemini_values = _field_values(docai_fields) if DEBUG_LOGGING else None
             gemini_fields = process_card_with_gemini_v2(
                 cropped_image_path,
                 docai_fields,  # Pass DocAI fields directly (not pre-validated)
                 valid_majors
             )
-            detect_field_value_discrepancies(pre_gemini_fields, gemini_fields, "Gemini Processing")
+            if DEBUG_LOGGING:
+                detect_field_value_discrepancies(pre_gemini_values, _field_values(gemini_fields), "Gemini Processing")
             log_worker_debug("Gemini Output", gemini_fields, verbose=True)
-            log_worker_debug("Gemini output field names", list(gemini_fields.keys()))
+            log_worker_debug(f"Gemini returned {len(gemini_fields)} fields")
             
-            # Track field values from Gemini output
-            gemini_output_values = {}
-            for field_name, field_data in gemini_fields.items():
-                if isinstance(field_data, dict):
-                    gemini_output_values[field_name] = {
-                        "value": field_data.get("value", ""),
-                        "confidence": field_data.get("confidence", 0.0),
-                        "enabled": field_data.get("enabled", True),
-                        "required": field_data.get("required", False)
-                    }
-            log_worker_debug("Field values from Gemini output", gemini_output_values)
+            if DEBUG_LOGGING:
+                log_worker_debug("Field values from Gemini output", _field_summary(gemini_fields, with_settings=True), verbose=True)
             
-            # Sync field types and options detected by Gemini
+            # Sync field types and options detected by Gemini (in the background; nothing below depends on it).
+            # Pass a snapshot so later steps can keep mutating gemini_fields.
             log_worker_debug("=== STEP 8.1: SYNC FIELD TYPES AND OPTIONS ===")
-            try:
-                sync_field_types_and_options(school_id, gemini_fields)
-                log_worker_debug("Field types and options synced successfully")
-            except Exception as sync_error:
-                log_worker_debug(f"Warning: Failed to sync field types: {str(sync_error)}")
-                # Don't fail the whole job for this, just log and continue
+            detected_field_info = {
+                field_name: {
+                    "field_type": field_data.get("field_type", "text"),
+                    "detected_options": list(field_data.get("detected_options", []))
+                }
+                for field_name, field_data in gemini_fields.items()
+                if isinstance(field_data, dict)
+            }
+            field_types_future = _io_pool.submit(_sync_field_types, school_id, detected_field_info)
             
         except Exception as gemini_error:
             log_worker_debug(f"⚠️ Gemini processing failed: {str(gemini_error)}")
@@ -504,7 +552,8 @@ def process_job_v2(job: Dict[str, Any]) -> None:
         log_worker_debug("=== STEP 9: ADDRESS VALIDATION ===")
         if not ai_processing_failed:
             # Only validate addresses if Gemini processing succeeded
-            validated_fields = validate_and_enhance_address(gemini_fields)
+            zip_validations = {docai_zip: zip_future.result()} if zip_future else None
+            validated_fields = validate_and_enhance_address(gemini_fields, zip_validations)
             log_worker_debug("Fields After Address Validation", validated_fields, verbose=True)
         else:
             # Skip address validation if AI failed
@@ -522,8 +571,7 @@ def process_job_v2(job: Dict[str, Any]) -> None:
             log_worker_debug("AI Processing Failed - Setting review_status to ai_failed")
         else:
             # Normal processing path - use address-validated fields
-            final_fields = validate_field_data(validated_fields)
-            review_status, fields_needing_review = determine_review_status(final_fields)
+            final_fields, review_status, fields_needing_review = validate_and_review(validated_fields)
             
         log_worker_debug("Final Fields", final_fields, verbose=True)
         log_worker_debug("Review Status", {
@@ -532,20 +580,11 @@ def process_job_v2(job: Dict[str, Any]) -> None:
             "ai_processing_failed": ai_processing_failed
         }, verbose=True)
         
-        # Step 11: Trim and upload image
-        log_worker_debug("=== STEP 11: TRIM AND UPLOAD IMAGE ===")
-        trimmed_image_path = ensure_trimmed_image(tmp_file)
-        trimmed_storage_path = None
-        try:
-            trimmed_storage_path = upload_to_supabase_storage_from_path(
-                supabase_client,
-                trimmed_image_path,
-                user_id,
-                os.path.basename(trimmed_image_path)
-            )
-            log_worker_debug(f"Trimmed image uploaded to Supabase: {trimmed_storage_path}")
-        except Exception as e:
-            log_worker_debug(f"Failed to upload trimmed image to Supabase: {e}")
+        # Step 11: Wait for the trimmed image upload started after Step 3
+        log_worker_debug("=== STEP 11: UPLOAD TRIMMED IMAGE ===")
+        trimmed_storage_path = trimmed_upload_future.result()
+        if field_types_future is not None:
+            field_types_future.result()
         
         # Step 12: Update job status and create review data
         log_worker_debug("=== STEP 12: UPDATE JOB STATUS ===")
@@ -561,7 +600,7 @@ def process_job_v2(job: Dict[str, Any]) -> None:
                 "required": final_fields.get(field, {}).get("required")
             }
             for field in critical_fields
-        })
+        }, verbose=True)
         
         # Filter out combined fields before saving
         final_fields = filter_combined_fields(final_fields)
@@ -576,7 +615,7 @@ def process_job_v2(job: Dict[str, Any]) -> None:
                 "required": final_fields.get(field, {}).get("required")
             }
             for field in critical_fields
-        })
+        }, verbose=True)
         
         now = datetime.now(timezone.utc).isoformat()
         review_data = {
@@ -600,17 +639,17 @@ def process_job_v2(job: Dict[str, Any]) -> None:
         log_worker_debug("🔍 CRITICAL FIELDS BEING SAVED TO DATABASE", {
             field_name: review_data["fields"].get(field_name, "FIELD_NOT_FOUND")
             for field_name in critical_fields
-        })
+        }, verbose=True)
         
         log_worker_debug("Review Data to be Saved", review_data, verbose=True)
         
         update_job_status_with_review(supabase_client, job_id, "complete", review_data)
         
-        log_worker_debug(f"✅ Job {job_id} completed successfully")
+        log_worker_debug(f"✅ Job {job_id} completed successfully in {time.perf_counter() - job_started:.2f}s")
         log_worker_debug("=== PROCESSING JOB V2 END ===\n")
         
     except Exception as e:
-        log_worker_debug(f"❌ Error processing job {job_id}: {str(e)}")
+        log_worker_debug(f"❌ Error processing job {job_id} after {time.perf_counter() - job_started:.2f}s: {str(e)}")
         log_worker_debug("Full traceback", traceback.format_exc())
         
         # Update job status to failed directly  
@@ -621,58 +660,135 @@ def process_job_v2(job: Dict[str, Any]) -> None:
             "updated_at": now
         })
         
-        # Clean up temporary files
-        if os.path.exists(tmp_file):
-            os.remove(tmp_file)
-            log_worker_debug(f"Cleaned up temporary file: {tmp_file}")
-        
         raise
+    finally:
+        cleanup.close()
+
+def _on_new_job(payload: Any) -> None:
+    """Realtime callback: wake the worker loop when a queued job is inserted."""
+    _job_wakeups.put(payload)
+
+async def _listen_for_new_jobs() -> None:
+    """Subscribe to processing_jobs rows becoming queued (Postgres changes via Supabase Realtime)."""
+    realtime_client = await acreate_client(SUPABASE_URL, SUPABASE_KEY)
+    channel = realtime_client.channel("jobs")
+    # New uploads arrive as INSERTs; requeued jobs (manual resets) arrive as UPDATEs
+    for event in ("INSERT", "UPDATE"):
+        channel.on_postgres_changes(
+            event,
+            schema="public",
+            table="processing_jobs",
+            filter="status=eq.queued",
+            callback=_on_new_job
+        )
+    try:
+        await channel.subscribe()
+        log_worker_debug("Subscribed to queued processing_jobs")
+        # Catch anything queued while we were (re)connecting
+        _job_wakeups.put(None)
+        # Stay subscribed until the socket drops for good; the caller then reconnects
+        await hold_realtime_connection(realtime_client.realtime)
+    finally:
+        await realtime_client.realtime.close()
+
+def _start_job_listener() -> None:
+    """Run the Realtime subscription on its own event loop in a daemon thread, reconnecting with backoff."""
+    def run():
+        attempt = 0
+        while True:
+            started = time.monotonic()
+            try:
+                asyncio.run(_listen_for_new_jobs())
+                log_worker_debug("Realtime job listener disconnected")
+            except UnsupportedRealtimeClient as e:
+                # Reconnecting cannot help; stop here so the failure is visible instead of looping
+                worker_logger.error(f"Realtime job listener disabled, relying on {JOB_HEARTBEAT_SECONDS}s heartbeat poll: {str(e)}")
+                return
+            except Exception as e:
+                log_worker_debug(f"Realtime job listener stopped, relying on {JOB_HEARTBEAT_SECONDS}s heartbeat poll until it reconnects: {str(e)}")
+            # Reset the backoff after a connection that stayed up for a while
+            attempt = 0 if time.monotonic() - started > JOB_HEARTBEAT_SECONDS else attempt + 1
+            time.sleep(min(2 ** attempt, JOB_HEARTBEAT_SECONDS))
+
+    threading.Thread(target=run, name="job-listener", daemon=True).start()
+
+def _run_job(job: Dict[str, Any]) -> None:
+    """Run process_job_v2 on a pool thread."""
+    try:
+        process_job_v2(job)
+    except Exception:
+        # process_job_v2 already logged the error and marked the job failed
+        pass
+
+def _run_claimed_job(job: Dict[str, Any]) -> None:
+    """Run a job claimed by main_v2, then free its slot and wake the loop to claim more."""
+    try:
+        _run_job(job)
+    finally:
+        _job_slots.release()
+        _job_wakeups.put(None)
+
+def _claim_queued_jobs() -> int:
+    """
+    Claim queued jobs until the queue is empty or every pool slot is busy,
+    submitting each one to the job executor. Returns the number claimed.
+    """
+    claimed = 0
+    while _job_slots.acquire(blocking=False):
+        try:
+            # Claim and mark as processing in one atomic round trip (safe across workers)
+            job = claim_next_processing_job(supabase_client, WORKER_ID)
+        except Exception:
+            _job_slots.release()
+            raise
+        if not job:
+            _job_slots.release()
+            break
+
+        log_worker_debug(f"Claimed job {job['id']} to process")
+        job_executor.submit(_run_claimed_job, job)
+        claimed += 1
+    return claimed
 
 def main_v2():
     """
-    Main worker loop using the new simplified processing pipeline
+    Main worker loop using the new simplified processing pipeline.
+    Claims queued jobs into the worker pool, then blocks until Realtime reports
+    a new insert, a pool slot frees up, or the heartbeat interval elapses.
     """
-    log_worker_debug("Starting CardCapture processing worker V2...")
-    
-    try:
-        log_worker_debug("=== CHECKING FOR QUEUED JOBS ===")
-        
-        # Get next queued job
-        jobs = supabase_client.table("processing_jobs").select("*").eq("status", "queued").order("created_at").limit(1).execute()
-        
-        if jobs.data and len(jobs.data) > 0:
-            job = jobs.data[0]
-            log_worker_debug(f"Found job {job['id']} to process")
-            
-            # Mark job as processing
-            now = datetime.now(timezone.utc).isoformat()
-            update_processing_job(supabase_client, job["id"], {
-                "status": "processing",
-                "updated_at": now
-            })
-            
-            # Process the job
-            process_job_v2(job)
-            
-        else:
-            log_worker_debug("No queued jobs found, sleeping...")
-            time.sleep(SLEEP_SECONDS)
-            
-    except Exception as e:
-        log_worker_debug(f"Worker error: {str(e)}")
-        log_worker_debug("Worker traceback", traceback.format_exc())
-        time.sleep(SLEEP_SECONDS)
+    log_worker_debug(f"Starting CardCapture processing worker V2 with {WORKER_CONCURRENCY} concurrent jobs...")
+    _start_job_listener()
+
+    while True:
+        try:
+            log_worker_debug("=== CHECKING FOR QUEUED JOBS ===")
+            claimed = _claim_queued_jobs()
+            if claimed:
+                log_worker_debug(f"Claimed {claimed} job(s)")
+            else:
+                log_worker_debug("No queued jobs claimed, waiting for new jobs...")
+        except Exception as e:
+            log_worker_debug(f"Worker error: {str(e)}")
+            log_worker_debug("Worker traceback", traceback.format_exc())
+
+        try:
+            _job_wakeups.get(timeout=JOB_HEARTBEAT_SECONDS)
+        except queue.Empty:
+            continue
+        # Coalesce notifications that arrived while we were busy; one pass covers them all
+        while not _job_wakeups.empty():
+            _job_wakeups.get_nowait()
 
-@app.post("/process")
-async def process_job_endpoint(request: Request):
+@app.post("/process", status_code=202)
+async def process_job_endpoint(request: Request, background_tasks: BackgroundTasks):
     try:
         # Log request details
         log_worker_debug("=== INCOMING REQUEST ===")
-        log_worker_debug("Headers", dict(request.headers))
-        log_worker_debug("Client", request.client)
+        log_worker_debug("Headers", dict(request.headers), verbose=True)
+        log_worker_debug("Client", request.client, verbose=True)
         
-        data = await request.json()
-        log_worker_debug("Request body", data)
+        data = orjson.loads(await request.body())
+        log_worker_debug("Request body", data, verbose=True)
         
         # Check if job_id is provided
         if not data or "job_id" not in data:
@@ -681,26 +797,26 @@ async def process_job_endpoint(request: Request):
         job_id = data["job_id"]
         log_worker_debug(f"Processing job_id: {job_id}")
         
-        # Fetch the job details from Supabase
-        job_query = supabase_client.table("processing_jobs").select("*").eq("id", job_id).maybe_single().execute()
+        # Claim the job (queued -> processing) in one round trip; Supabase calls are blocking,
+        # so keep them off the event loop
+        job = await run_in_threadpool(try_claim_processing_job, supabase_client, job_id, WORKER_ID)
         
-        if not job_query.data:
-            log_worker_debug(f"Job {job_id} not found in database")
-            raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+        if not job:
+            # Either a duplicate dispatch (another worker already claimed it) or an unknown job
+            job_query = await run_in_threadpool(
+                lambda: supabase_client.table("processing_jobs").select("status").eq("id", job_id).maybe_single().execute()
+            )
+            if not job_query or not job_query.data:
+                log_worker_debug(f"Job {job_id} not found in database")
+                raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+            log_worker_debug(f"Job {job_id} is already {job_query.data.get('status')}, skipping duplicate dispatch")
+            return {"status": "skipped", "job_id": job_id, "message": f"Job {job_id} is already {job_query.data.get('status')}"}
             
-        job = job_query.data
-        log_worker_debug("Found job in database", job)
+        log_worker_debug("Claimed job", job, verbose=True)
         
-        # Update status to processing using direct table update
-        now = datetime.now(timezone.utc).isoformat()
-        update_processing_job(supabase_client, job_id, {
-            "status": "processing", 
-            "updated_at": now
-        })
-        
-        # Process the job
-        process_job_v2(job)
-        return {"status": "success", "message": f"Job {job_id} processing started"}
+        # Hand the job to the worker pool after the 202 is sent, so the caller never waits on DocAI/Gemini
+        background_tasks.add_task(job_executor.submit, _run_job, job)
+        return {"status": "accepted", "job_id": job_id, "message": f"Job {job_id} processing started"}
         
     except HTTPException:
         raise
@@ -709,16 +825,36 @@ async def process_job_endpoint(request: Request):
         log_worker_debug("Full traceback", traceback.format_exc())
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/invalidate-school/{school_id}")
+def invalidate_school(school_id: str):
+    """
+    Drop a school's cached processor id, field requirements and majors (call after admin edits)
+    """
+    invalidate_school_config(school_id)
+    log_worker_debug(f"Invalidated cached config for school {school_id}")
+    return {"status": "success", "message": f"Cached config for school {school_id} cleared"}
+
 @app.post("/retry-ai-processing/{document_id}")
 async def retry_ai_processing(document_id: str):
     """
     Retry Gemini processing for a card that failed AI processing
     """
+    # Download, Gemini and Supabase calls all block; run them on the retry pool, not the event loop
+    return await asyncio.get_running_loop().run_in_executor(retry_executor, _retry_ai_processing, document_id)
+
+def _retry_ai_processing(document_id: str) -> Dict[str, Any]:
+    """
+    Blocking body of retry_ai_processing
+    """
+    # Scratch files to remove however the retry ends
+    cleanup = ExitStack()
     try:
         log_worker_debug(f"=== RETRY AI PROCESSING FOR {document_id} ===")
         
-        # Get the reviewed_data record
-        review_query = supabase_client.table("reviewed_data").select("*").eq("document_id", document_id).maybe_single().execute()
+        # Get the reviewed_data record (only the columns the retry reads)
+        review_query = supabase_client.table("reviewed_data").select(
+            "review_status, ai_error_message, trimmed_image_path, fields, school_id"
+        ).eq("document_id", document_id).maybe_single().execute()
         if not review_query.data:
             log_worker_debug(f"Card {document_id} not found in reviewed_data")
             raise HTTPException(status_code=404, detail="Card not found")
@@ -746,71 +882,80 @@ async def retry_ai_processing(document_id: str):
             "field_count": len(docai_fields)
         })
         
-        # Get valid majors for school
-        majors_query = supabase_client.table("schools").select("majors").eq("id", school_id).maybe_single().execute()
-        valid_majors = majors_query.data.get("majors") if majors_query and majors_query.data else []
-        log_worker_debug("Valid majors for retry", valid_majors)
-        
-        # Download the trimmed image to process with Gemini
-        # The trimmed_image_path is a storage path, we need to download it
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.jpg') as tmp:
-            temp_image_path = tmp.name
-        
-        try:
-            download_from_supabase(trimmed_image_path, temp_image_path)
-            log_worker_debug(f"Downloaded trimmed image for retry: {temp_image_path}")
+        # Start downloading the trimmed image, then look up the school's majors while it runs.
+        # The trimmed_image_path is a storage path; keep the bytes in memory and send them inline
+        download_future = _io_pool.submit(download_bytes_from_supabase, trimmed_image_path)
+        valid_majors = get_school_config(school_id)[2]
+        
+        # Fast path: DocAI already read every field confidently and there is no major to map,
+        # so Gemini would have nothing to add
+        if not valid_majors and _docai_fields_confident(docai_fields):
+            # The image is not needed; drop the download if it has not started yet
+            download_future.cancel()
+            log_worker_debug("DocAI fields already high confidence, skipping Gemini", {"retry_path": "docai_fastpath"})
+            gemini_fields = {
+                field_name: {**field_data, "notes": "High-confidence OCR data - AI retry skipped"} if isinstance(field_data, dict) else field_data
+                for field_name, field_data in docai_fields.items()
+            }
+        else:
+            image_bytes = download_future.result()
+            log_worker_debug(f"Downloaded trimmed image for retry: {len(image_bytes)} bytes")
+            image_path = trimmed_image_path  # Storage path, for the MIME type
+            if len(image_bytes) > INLINE_IMAGE_MAX_BYTES:
+                # Too large to send inline: write it out so Gemini uploads it from disk, as the main path does
+                fd, image_path = tempfile.mkstemp(suffix=os.path.splitext(trimmed_image_path)[1] or '.jpg')
+                cleanup.callback(_remove_file, image_path)
+                with os.fdopen(fd, 'wb') as tmp:
+                    tmp.write(image_bytes)
+                image_bytes = None
+            
+            log_worker_debug("Valid majors for retry", valid_majors, verbose=True)
             
             # Retry Gemini processing
-            log_worker_debug("Retrying Gemini processing...")
+            log_worker_debug("Retrying Gemini processing...", {"retry_path": "gemini"})
             gemini_fields = process_card_with_gemini_v2(
-                temp_image_path,    # Downloaded cropped image
+                image_path,
                 docai_fields,       # Original DocAI fields 
-                valid_majors
+                valid_majors,
+                image_bytes=image_bytes
             )
             log_worker_debug("Retry Gemini processing successful", verbose=True)
-            
-            # Apply address validation to cleaned Gemini data (same as main pipeline)
-            log_worker_debug("Applying address validation to retry results...")
-            validated_fields = validate_and_enhance_address(gemini_fields)
-            log_worker_debug("Retry address validation complete", verbose=True)
-            
-            # Determine new review status with address-validated data
-            final_fields = validate_field_data(validated_fields)
-            new_review_status, fields_needing_review = determine_review_status(final_fields)
-            
-            log_worker_debug("New review status after retry", {
-                "status": new_review_status,
-                "fields_needing_review": fields_needing_review
-            })
-            
-            # Filter out combined fields before saving to reviewed_data
-            log_worker_debug("Filtering combined fields before retry save")
-            filtered_fields = filter_combined_fields(final_fields)
-            log_worker_debug(f"Retry fields before filtering: {len(final_fields)}, after filtering: {len(filtered_fields)}")
-            
-            # Update reviewed_data with successful results
-            now = datetime.now(timezone.utc).isoformat()
-            update_result = supabase_client.table("reviewed_data").update({
-                "fields": filtered_fields,            # Now has proper Gemini data without combined fields
-                "review_status": new_review_status,   # Proper review status
-                "ai_error_message": None,            # Clear the error
-                "updated_at": now
-            }).eq("document_id", document_id).execute()
-            
-            log_worker_debug("Updated reviewed_data successfully")
-            
-            return {
-                "status": "success", 
-                "message": "AI processing retry completed successfully",
-                "new_review_status": new_review_status,
-                "fields_updated": len(final_fields)
-            }
-            
-        finally:
-            # Clean up temporary image file
-            if os.path.exists(temp_image_path):
-                os.remove(temp_image_path)
-                log_worker_debug(f"Cleaned up temporary retry image: {temp_image_path}")
+        
+        # Apply address validation to cleaned Gemini data (same as main pipeline)
+        log_worker_debug("Applying address validation to retry results...")
+        validated_fields = validate_and_enhance_address(gemini_fields)
+        log_worker_debug("Retry address validation complete", verbose=True)
+        
+        # Determine new review status with address-validated data
+        final_fields, new_review_status, fields_needing_review = validate_and_review(validated_fields)
+        
+        log_worker_debug("New review status after retry", {
+            "status": new_review_status,
+            "fields_needing_review": fields_needing_review
+        })
+        
+        # Filter out combined fields before saving to reviewed_data
+        log_worker_debug("Filtering combined fields before retry save")
+        filtered_fields = filter_combined_fields(final_fields)
+        log_worker_debug(f"Retry fields before filtering: {len(final_fields)}, after filtering: {len(filtered_fields)}")
+        
+        # Update reviewed_data with successful results
+        now = datetime.now(timezone.utc).isoformat()
+        update_result = supabase_client.table("reviewed_data").update({
+            "fields": filtered_fields,            # Now has proper Gemini data without combined fields
+            "review_status": new_review_status,   # Proper review status
+            "ai_error_message": None,            # Clear the error
+            "updated_at": now
+        }).eq("document_id", document_id).execute()
+        
+        log_worker_debug("Updated reviewed_data successfully")
+        
+        return {
+            "status": "success", 
+            "message": "AI processing retry completed successfully",
+            "new_review_status": new_review_status,
+            "fields_updated": len(final_fields)
+        }
         
     except HTTPException:
         raise
@@ -818,8 +963,11 @@ async def retry_ai_processing(document_id: str):
         log_worker_debug(f"Error retrying AI processing for {document_id}: {str(e)}")
         log_worker_debug("Full retry error traceback:", traceback.format_exc())
         raise HTTPException(status_code=500, detail=f"Retry failed: {str(e)}")
+    finally:
+        cleanup.close()
 
 
 if __name__ == "__main__":
     port = int(os.environ.get("PORT", 8080))
-    uvicorn.run(app, host="0.0.0.0", port=port) 
\ No newline at end of file
+    # uvicorn[standard] provides uvloop and httptools, which "auto" picks up; Cloud Run already logs each request
+    uvicorn.run(app, host="0.0.0.0", port=port, loop="auto", http="auto", access_log=False) 
\ No newline at end of file
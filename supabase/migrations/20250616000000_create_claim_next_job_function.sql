@@ -0,0 +1,38 @@
+-- Track which worker instance claimed a job
+alter table processing_jobs add column if not exists worker_id uuid;
+
+-- Atomically claim the oldest queued job in a single round trip.
+-- FOR UPDATE SKIP LOCKED lets several workers poll the queue concurrently
+-- without ever handing the same job out twice.
+-- The job is returned with its school's DocAI processor, card_fields and majors,
+-- so the worker needs no follow-up schools lookup.
+create or replace function claim_next_job(p_worker_id uuid default null)
+returns setof jsonb
+language sql
+security definer set search_path = public
+as $$
+  with claimed as (
+    update processing_jobs
+       set status = 'processing',
+           updated_at = now(),
+           worker_id = p_worker_id
+     where id = (
+       select id
+         from processing_jobs
+        where status = 'queued'
+        order by created_at
+        for update skip locked
+        limit 1
+     )
+    returning *
+  )
+  select to_jsonb(claimed) || jsonb_build_object(
+           'docai_processor_id', s.docai_processor_id,
+           'card_fields', s.card_fields,
+           'majors', s.majors
+         )
+    from claimed
+    left join schools s on s.id = claimed.school_id;
+$$;
+
+grant execute on function claim_next_job(uuid) to service_role;
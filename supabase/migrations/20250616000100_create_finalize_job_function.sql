@@ -0,0 +1,48 @@
+-- Finish a job in a single round trip: upsert its reviewed_data row and
+-- set the processing_jobs status inside one transaction.
+-- On conflict only the keys present in p_reviewed are written; an omitted key
+-- (e.g. ai_error_message on a successful retry) keeps the stored value. To clear
+-- a column, pass the key with a JSON null.
+-- Returns the job's new status; raises (rolling back the upsert) if the job does not exist.
+create or replace function finalize_job(p_job_id uuid, p_status text, p_reviewed jsonb)
+returns text
+language plpgsql
+security definer set search_path = public
+as $$
+declare
+  v_status text;
+begin
+  insert into reviewed_data (
+    document_id, fields, school_id, user_id, event_id, image_path,
+    trimmed_image_path, review_status, ai_error_message, created_at, updated_at
+  )
+  select document_id, fields, school_id, user_id, event_id, image_path,
+         trimmed_image_path, review_status, ai_error_message,
+         coalesce(created_at, now()), coalesce(updated_at, now())
+    from jsonb_populate_record(null::reviewed_data, p_reviewed)
+  on conflict (document_id) do update
+     set fields = case when p_reviewed ? 'fields' then excluded.fields else reviewed_data.fields end,
+         school_id = case when p_reviewed ? 'school_id' then excluded.school_id else reviewed_data.school_id end,
+         user_id = case when p_reviewed ? 'user_id' then excluded.user_id else reviewed_data.user_id end,
+         event_id = case when p_reviewed ? 'event_id' then excluded.event_id else reviewed_data.event_id end,
+         image_path = case when p_reviewed ? 'image_path' then excluded.image_path else reviewed_data.image_path end,
+         trimmed_image_path = case when p_reviewed ? 'trimmed_image_path' then excluded.trimmed_image_path else reviewed_data.trimmed_image_path end,
+         review_status = case when p_reviewed ? 'review_status' then excluded.review_status else reviewed_data.review_status end,
+         ai_error_message = case when p_reviewed ? 'ai_error_message' then excluded.ai_error_message else reviewed_data.ai_error_message end,
+         updated_at = excluded.updated_at;
+
+  update processing_jobs
+     set status = p_status,
+         updated_at = now()
+   where id = p_job_id
+  returning status into v_status;
+
+  if not found then
+    raise exception 'finalize_job: processing job % not found', p_job_id;
+  end if;
+
+  return v_status;
+end;
+$$;
+
+grant execute on function finalize_job(uuid, text, jsonb) to service_role;
@@ -0,0 +1,27 @@
+-- Claim one specific job, but only if it is still queued.
+-- Returns the job (with its school's DocAI processor, card_fields and majors) when
+-- this call moved it queued -> processing, and no row when another worker got there first.
+create or replace function try_claim_job(p_job_id uuid, p_worker_id uuid default null)
+returns setof jsonb
+language sql
+security definer set search_path = public
+as $$
+  with claimed as (
+    update processing_jobs
+       set status = 'processing',
+           updated_at = now(),
+           worker_id = p_worker_id
+     where id = p_job_id
+       and status = 'queued'
+    returning *
+  )
+  select to_jsonb(claimed) || jsonb_build_object(
+           'docai_processor_id', s.docai_processor_id,
+           'card_fields', s.card_fields,
+           'majors', s.majors
+         )
+    from claimed
+    left join schools s on s.id = claimed.school_id;
+$$;
+
+grant execute on function try_claim_job(uuid, uuid) to service_role;
@@ -0,0 +1,16 @@
+-- Publish processing_jobs row changes to Supabase Realtime, so workers are
+-- woken by new (INSERT) and requeued (UPDATE) jobs instead of waiting for
+-- their heartbeat poll.
+do $$
+begin
+  if not exists (
+    select 1
+      from pg_publication_tables
+     where pubname = 'supabase_realtime'
+       and schemaname = 'public'
+       and tablename = 'processing_jobs'
+  ) then
+    alter publication supabase_realtime add table public.processing_jobs;
+  end if;
+end
+$$;
@@ -0,0 +1,7 @@
+import os
+
+# app.core.clients refuses to import without Supabase settings; no request is made with these
+os.environ.setdefault("SUPABASE_URL", "https://example.supabase.co")
+os.environ.setdefault("SUPABASE_SERVICE_ROLE_KEY", "test-service-role-key")
+# Log to stdout only, as on Cloud Run, so test runs leave no debug log files behind
+os.environ.setdefault("K_SERVICE", "tests")
@@ -0,0 +1,65 @@
+import pytest
+
+# The worker module pulls in the full service stack (requirements.txt)
+for module in ("fastapi", "google.cloud.documentai_v1", "googlemaps", "PIL"):
+    pytest.importorskip(module)
+
+from app.worker.worker_v2 import split_combined_address_fields
+
+
+def _split(value, **fields):
+    fields["city_state_zip"] = {"value": value, "confidence": 0.9}
+    return split_combined_address_fields(fields)
+
+
+def _values(fields):
+    return {key: fields[key]["value"] for key in ("city", "state", "zip_code") if key in fields}
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("Austin, TX, 78701", {"city": "Austin", "state": "TX", "zip_code": "78701"}),
+    ("Austin, TX 78701-1234", {"city": "Austin", "state": "TX", "zip_code": "78701-1234"}),
+    ("Austin, TX", {"city": "Austin", "state": "TX"}),
+    ("Austin, TX.", {"city": "Austin", "state": "TX"}),
+    ("San Antonio TX 78205", {"city": "San Antonio", "state": "TX", "zip_code": "78205"}),
+    ("San Antonio TX", {"city": "San Antonio", "state": "TX"}),
+])
+def test_splits_each_combined_format(value, expected):
+    fields = _split(value)
+
+    assert _values(fields) == expected
+    for key in expected:
+        assert fields[key]["source"] == "address_splitting"
+        assert fields[key]["confidence"] == 0.9
+
+
+def test_normalizes_whitespace_before_matching():
+    assert _values(_split("San\nAntonio,\tTX   78205")) == {
+        "city": "San Antonio", "state": "TX", "zip_code": "78205",
+    }
+
+
+def test_falls_back_to_first_state_code():
+    fields = _split("Austin TX 78701 usa")
+
+    assert _values(fields) == {"city": "Austin", "state": "TX", "zip_code": "78701"}
+    assert fields["city"]["source"] == "address_splitting_fallback"
+
+
+def test_skips_values_without_uppercase_letters():
+    fields = _split("austin, tx 78701")
+
+    assert _values(fields) == {}
+
+
+def test_leaves_fields_alone_when_already_split():
+    existing = {key: {"value": value} for key, value in (("city", "Dallas"), ("state", "TX"), ("zip_code", "75201"))}
+    fields = _split("Austin, TX 78701", **existing)
+
+    assert _values(fields) == {"city": "Dallas", "state": "TX", "zip_code": "75201"}
+
+
+def test_ignores_empty_combined_fields():
+    fields = {"city_state_zip": {"value": ""}, "city": {"value": "Dallas"}}
+
+    assert split_combined_address_fields(fields) == {"city_state_zip": {"value": ""}, "city": {"value": "Dallas"}}
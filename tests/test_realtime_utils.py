@@ -0,0 +1,90 @@
+import asyncio
+
+import pytest
+
+from app.utils.realtime_utils import UnsupportedRealtimeClient, hold_realtime_connection
+
+
+class FakeRealtime:
+    """Stand-in for realtime-py's AsyncRealtimeClient: a socket flag and the task reading it."""
+
+    def __init__(self, listen_task=None):
+        self._ws_connection = object() if listen_task is not None else None
+        self._listen_task = listen_task
+
+    @property
+    def is_connected(self):
+        return self._ws_connection is not None
+
+
+async def _reader(stop: asyncio.Event):
+    await stop.wait()
+
+
+def test_stays_subscribed_while_socket_is_read():
+    async def scenario():
+        stop = asyncio.Event()
+        realtime = FakeRealtime(asyncio.create_task(_reader(stop)))
+        holder = asyncio.create_task(hold_realtime_connection(realtime))
+
+        await asyncio.sleep(0.05)
+        assert not holder.done()
+
+        stop.set()
+        await asyncio.wait_for(holder, 1)
+
+    asyncio.run(scenario())
+
+
+def test_follows_listen_task_across_reconnect():
+    async def scenario():
+        first_stop, second_stop = asyncio.Event(), asyncio.Event()
+        realtime = FakeRealtime(asyncio.create_task(_reader(first_stop)))
+        holder = asyncio.create_task(hold_realtime_connection(realtime))
+        await asyncio.sleep(0)
+
+        # Auto-reconnect: a new reader replaces the old one before it finishes
+        realtime._listen_task = asyncio.create_task(_reader(second_stop))
+        first_stop.set()
+        await asyncio.sleep(0.05)
+        assert not holder.done()
+
+        second_stop.set()
+        await asyncio.wait_for(holder, 1)
+
+    asyncio.run(scenario())
+
+
+def test_returns_when_connection_is_lost():
+    async def scenario():
+        stop = asyncio.Event()
+        realtime = FakeRealtime(asyncio.create_task(_reader(stop)))
+        holder = asyncio.create_task(hold_realtime_connection(realtime))
+        await asyncio.sleep(0)
+
+        # Reconnect gave up: the socket is cleared and the reader ends
+        realtime._ws_connection = None
+        stop.set()
+        await asyncio.wait_for(holder, 1)
+
+    asyncio.run(scenario())
+
+
+def test_returns_immediately_without_a_reader():
+    async def scenario():
+        # Never connected
+        await asyncio.wait_for(hold_realtime_connection(FakeRealtime()), 1)
+        # Connected, but no task reading the socket
+        realtime = FakeRealtime()
+        realtime._ws_connection = object()
+        await asyncio.wait_for(hold_realtime_connection(realtime), 1)
+
+    asyncio.run(scenario())
+
+
+def test_fails_loudly_when_client_has_no_listen_task():
+    class UpgradedRealtime:
+        is_connected = True
+
+    with pytest.raises(UnsupportedRealtimeClient):
+        asyncio.run(hold_realtime_connection(UpgradedRealtime()))
@@ -0,0 +1,73 @@
+import pytest
+
+from app.services.review_service import (
+    _validate_date_format,
+    _validate_phone_format,
+    determine_review_status,
+    validate_and_review,
+    validate_field_data,
+)
+
+
+@pytest.mark.parametrize("phone, expected", [
+    ("(512) 555-0123", "512-555-0123"),
+    ("512.555.0123", "512-555-0123"),
+    ("1 512 555 0123", "512-555-0123"),
+    ("+1 (512) 555-0123", "512-555-0123"),
+    ("555-0123", "555-0123"),
+    ("2 512 555 0123", "2 512 555 0123"),
+])
+def test_validate_phone_format(phone, expected):
+    assert _validate_phone_format(phone) == expected
+
+
+@pytest.mark.parametrize("date, expected", [
+    ("3/7/2006", "03/07/2006"),
+    ("03-07-2006", "03/07/2006"),
+    ("3.7.2006", "03/07/2006"),
+    ("2006-03-07", "03/07/2006"),
+    ("2006-3-7", "03/07/2006"),
+    (" 12/31/2005 ", "12/31/2005"),
+    ("2/30/2006", "2/30/2006"),
+    ("2006-13-01", "2006-13-01"),
+    ("March 7, 2006", "March 7, 2006"),
+])
+def test_validate_date_format(date, expected):
+    assert _validate_date_format(date) == expected
+
+
+def _fields():
+    return {
+        "cell": {"value": "(512) 555-0123", "confidence": 0.95, "required": True},
+        "date_of_birth": {"value": "2006-03-07", "confidence": 0.95, "required": True},
+        "email": {"value": "N/A", "confidence": 0.95, "required": True},
+        "name": {"value": "Jordan Lee", "confidence": 0.5, "required": True},
+        "major": {"value": "", "confidence": 0.2, "required": False, "requires_human_review": True},
+        "notes": {"value": "", "enabled": False, "required": True},
+    }
+
+
+def test_validate_and_review_cleans_and_flags_in_one_pass():
+    fields, status, needing_review = validate_and_review(_fields())
+
+    assert fields["cell"]["value"] == "512-555-0123"
+    assert fields["date_of_birth"]["value"] == "03/07/2006"
+    assert fields["email"]["value"] == ""
+    assert status == "needs_human_review"
+    assert needing_review == ["email", "name"]
+    assert fields["email"]["review_notes"] == "Required field is empty"
+    assert fields["name"]["review_notes"] == "Required field has low confidence (0.50)"
+    assert fields["major"]["requires_human_review"] is False
+
+
+def test_validate_and_review_matches_separate_passes():
+    separate = validate_field_data(_fields())
+    expected_status, expected_review = determine_review_status(separate)
+
+    assert validate_and_review(_fields()) == (separate, expected_status, expected_review)
+
+
+def test_validate_and_review_marks_clean_card_reviewed():
+    fields = {"name": {"value": "Jordan Lee", "confidence": 0.4, "review_confidence": 0.9, "required": True}}
+
+    assert validate_and_review(fields)[1:] == ("reviewed", [])
@@ -0,0 +1,41 @@
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("fastapi")
+
+from fastapi import HTTPException
+
+from app.repositories.uploads_repository import update_job_status_with_review
+
+
+class FakeSupabase:
+    """Records rpc() calls and answers them with a fixed response payload."""
+
+    def __init__(self, data):
+        self.data = data
+        self.calls = []
+
+    def rpc(self, name, params):
+        self.calls.append((name, params))
+        return SimpleNamespace(execute=lambda: SimpleNamespace(data=self.data))
+
+
+REVIEW_DATA = {"document_id": "doc-1", "fields": {"cell": {"value": "512-555-0123"}}, "review_status": "reviewed"}
+
+
+def test_finalizes_job_in_one_rpc():
+    client = FakeSupabase("complete")
+
+    response = update_job_status_with_review(client, "job-1", "complete", REVIEW_DATA)
+
+    assert response.data == "complete"
+    assert client.calls == [("finalize_job", {"p_job_id": "job-1", "p_status": "complete", "p_reviewed": REVIEW_DATA})]
+
+
+@pytest.mark.parametrize("returned", [None, "processing"])
+def test_raises_when_job_was_not_finalized(returned):
+    with pytest.raises(HTTPException) as excinfo:
+        update_job_status_with_review(FakeSupabase(returned), "job-1", "complete", REVIEW_DATA)
+
+    assert "job-1" in excinfo.value.detail